@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 import contextlib
 import inspect
 from telegram import Update
@@ -8,31 +9,39 @@ from telegram.ext import Application, MessageHandler, ContextTypes, filters
 from src.config import TELEGRAM_BOT_TOKEN
 from src.bot.commands import register_all_commands
 from src.bot.commands_list import commands
-from src.library.login import login_and_get_sid
-from src.library.alert_monitor import start_alert_monitoring
+from src.bot.rate_limiter import OutboundRateLimiter
+from src.library.session_manager import SessionManager, SessionStore
+from src.library.alert_monitor import set_alert_rules, start_alert_monitoring
+from src.library.http_client import close_client
+from src.library.history_store import club_history
+from src.database import db_manager, chat_club_sync, role_sync, alert_rule_sync
+from src.utils.roles import set_roles
+from src.config import ALERT_RULES_REFRESH_SECONDS, ROLE_REFRESH_SECONDS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How long a display ID confirmed missing after a reload is rejected without
+# triggering another reload
+CLUB_ID_MISS_TTL_SECONDS = 60
+
 async def load_club_mappings(application):
-    from src.database import db_manager
-    from src.library.get_all_club_limits import get_all_club_limits
+    from src.library.club_snapshot import club_snapshots
     
     try:
-        chat_club_mapping = db_manager.get_chat_club_mapping()
-        application.bot_data["chat_club_map"] = chat_club_mapping
-        logger.info(f"Loaded {len(chat_club_mapping)} chat-club mappings")
+        # Incremental: only rows changed since the last sync are fetched
+        try:
+            await chat_club_sync.sync()
+        except Exception as e:
+            logger.error(f"Chat-club sync failed, keeping previous mapping: {e}")
+        application.bot_data["chat_club_map"] = chat_club_sync.mapping
+        application.bot_data["club_chat_index"] = chat_club_sync.club_chats
         
-        connect_sid = application.bot_data.get("sid")
-        if connect_sid:
-            club_data = await get_all_club_limits(connect_sid)
-            if club_data and club_data.DATA:
-                club_backend_mapping = {}
-                for club in club_data.DATA:
-                    display_id = int(club.f1)
-                    backend_id = int(club.cno)
-                    club_backend_mapping[display_id] = backend_id
-                
+        session = application.bot_data.get("session")
+        if session and session.sid:
+            snapshot = await club_snapshots.get(session)
+            if snapshot and snapshot.clubs:
+                club_backend_mapping = snapshot.club_id_map()
                 application.bot_data["club_id_map"] = club_backend_mapping
                 logger.info(f"Loaded {len(club_backend_mapping)} club-backend mappings")
             else:
@@ -44,16 +53,49 @@ async def load_club_mappings(application):
             
     except Exception as e:
         logger.error(f"Failed to load club mappings: {e}")
-        application.bot_data["chat_club_map"] = {}
+        application.bot_data.setdefault("chat_club_map", chat_club_sync.mapping)
+        application.bot_data.setdefault("club_chat_index", chat_club_sync.club_chats)
         application.bot_data["club_id_map"] = {}
 
+async def reload_club_mappings(application):
+    """
+    Single-flight wrapper around load_club_mappings: callers that arrive
+    while a reload is running wait for that reload instead of starting one.
+    """
+    task = application.bot_data.get("mapping_reload_task")
+    if task is None or task.done():
+        task = asyncio.create_task(load_club_mappings(application))
+        application.bot_data["mapping_reload_task"] = task
+    await asyncio.shield(task)
+
 async def map_club_id(display_id: int, context) -> int:
-    if (context.application.bot_data.get("club_id_map") is None or
-            display_id not in context.application.bot_data["club_id_map"]):
-        await load_club_mappings(context.application)
+    bot_data = context.application.bot_data
+    club_id_map = bot_data.get("club_id_map")
+    if club_id_map is not None and display_id in club_id_map:
+        return club_id_map[display_id]
+
+    # Recently confirmed missing: answer without another union reload
+    misses = bot_data.setdefault("club_id_misses", {})
+    expires_at = misses.get(display_id)
+    if expires_at is not None:
+        if expires_at > time.monotonic():
+            raise ValueError(f"No backend_id found for display_id: {display_id}")
+        del misses[display_id]
+
+    await reload_club_mappings(context.application)
     
-    club_id_map = context.application.bot_data.get("club_id_map", {})
+    club_id_map = bot_data.get("club_id_map", {})
     if display_id not in club_id_map:
+        # Only cache the miss if the reload produced a full mapping; a
+        # partial sweep may just have lost the page this club is on
+        from src.library.club_snapshot import club_snapshots
+        snapshot = club_snapshots.snapshot
+        if club_id_map and snapshot is not None and snapshot.complete:
+            now = time.monotonic()
+            # Drop expired misses so mistyped IDs don't pile up forever
+            for stale in [k for k, t in misses.items() if t <= now]:
+                del misses[stale]
+            misses[display_id] = now + CLUB_ID_MISS_TTL_SECONDS
         raise ValueError(f"No backend_id found for display_id: {display_id}")
     
     return club_id_map[display_id]
@@ -65,33 +107,82 @@ def get_chat_club_id(chat_id: int, context) -> int:
     return chat_club_map[chat_id]
 
 async def ensure_sid(app):
-    try:
-        sid = await login_and_get_sid()
+    session = SessionManager(store=SessionStore())
+    app.bot_data["session"] = session
+
+    # Mirror the current SID for code that still reads bot_data["sid"]
+    def _publish(sid: str):
         app.bot_data["sid"] = sid
-        logger.info("Session established")
+    session.add_listener(_publish)
+
+    try:
+        await session.start()
     except Exception as e:
         logger.error(f"Session failed: {e}")
         raise
 
-async def sid_refresher(application):
+async def mapping_refresher(application):
     while True:
         try:
             await asyncio.sleep(3000)  # 50 minutes
             
-            sid = await login_and_get_sid()
-            application.bot_data["sid"] = sid
-            
             logger.info("Refreshing club mappings...")
-            await load_club_mappings(application)
+            await reload_club_mappings(application)
             logger.info("Club mappings refreshed")
         except Exception as e:
-            logger.exception("Failed to refresh sid: %s", e)
+            logger.exception("Failed to refresh club mappings: %s", e)
+
+async def refresh_roles(force: bool = False) -> bool:
+    """
+    Pull roles/permissions from the DB role store into the in-memory index.
+    Returns True if the roles changed. Permission checks never hit the DB.
+    """
+    result = await role_sync.sync(force=force)
+    if not result:
+        return False
+    new_user_roles, new_permissions = result
+    set_roles(new_user_roles, new_permissions)
+    logger.info("Role index rebuilt from database")
+    return True
+
+async def role_refresher():
+    while True:
+        await asyncio.sleep(ROLE_REFRESH_SECONDS)
+        try:
+            await refresh_roles()
+        except Exception as e:
+            logger.error(f"Failed to refresh roles: {e}")
+
+async def refresh_alert_rules(force: bool = False) -> bool:
+    """
+    Pull alert rules/regions from the DB and recompile the sweep's rule
+    arrays. Returns True if the rules changed. The sweep never hits the DB.
+    """
+    result = await alert_rule_sync.sync(force=force)
+    if not result:
+        return False
+    rule_rows, region_rows = result
+    set_alert_rules(rule_rows, region_rows)
+    return True
+
+async def alert_rules_refresher():
+    while True:
+        await asyncio.sleep(ALERT_RULES_REFRESH_SECONDS)
+        try:
+            await refresh_alert_rules()
+        except Exception as e:
+            logger.error(f"Failed to refresh alert rules: {e}")
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     logger.error(f"Update {update} caused error {context.error}")
 
 async def main():
-    app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    app = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .rate_limiter(OutboundRateLimiter())
+        .build()
+    )
     
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, lambda u, c: None))
     app.add_error_handler(error_handler)
@@ -102,6 +193,16 @@ async def main():
     await app.initialize()
     await ensure_sid(app)
     
+    try:
+        await refresh_roles(force=True)
+    except Exception as e:
+        logger.warning(f"Role store unavailable, using built-in roles: {e}")
+
+    try:
+        await refresh_alert_rules(force=True)
+    except Exception as e:
+        logger.warning(f"Alert rules unavailable, using built-in thresholds: {e}")
+    
     logger.info("Loading club mappings...")
     await load_club_mappings(app)
     logger.info("Club mappings loaded")
@@ -117,7 +218,10 @@ async def main():
         raise
     
     asyncio.create_task(start_alert_monitoring(app.bot, app))
-    asyncio.create_task(sid_refresher(app))
+    asyncio.create_task(app.bot_data["session"].run())
+    asyncio.create_task(mapping_refresher(app))
+    asyncio.create_task(role_refresher())
+    asyncio.create_task(alert_rules_refresher())
     
     logger.info("Bot started")
     
@@ -127,6 +231,9 @@ async def main():
         logger.info("Bot stopped")
     finally:
         await app.stop()
+        await close_client()
+        await db_manager.close()
+        club_history.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -7,8 +7,12 @@ from .addsl import register_addsl
 from .subsl import register_subsl
 from .setwl import register_setwl
 from .setsl import register_setsl
+from .bulklimit import register_bulklimit
 from .scr import register_scr
+from .scrbatch import register_scrbatch
 from .ccr import register_ccr
+from .reloadroles import register_reloadroles
+from .upload import register_upload
 
 
 def register_all_commands(application):
@@ -24,5 +28,9 @@ def register_all_commands(application):
     register_subsl(application)
     register_setwl(application)
     register_setsl(application)
+    register_bulklimit(application)
     register_scr(application)
+    register_scrbatch(application)
     register_ccr(application)
+    register_reloadroles(application)
+    register_upload(application)
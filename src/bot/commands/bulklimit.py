@@ -0,0 +1,140 @@
+import re
+import time
+from typing import List, Tuple
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+
+from src.utils.parse import parse_args_safe, clean_id
+from src.utils.can_manage_club import can_manage_club
+from src.utils.markdown import md_listing, md_safe
+from src.utils.roles import COMMAND_TO_CAP, get_user_access
+
+from src.library.limit_ops import LIMIT_OPS, bulk_change_limits
+
+USAGE = (
+    "Usage: /bulklimit <op> <amount> <clubs>\n"
+    "op: addwl, subwl, setwl, addsl, subsl, setsl\n"
+    "clubs: all (every club you manage), region (your Region Head clubs) "
+    "or a list of club IDs\n\n"
+    "Examples:\n/bulklimit setwl 5000 all\n/bulklimit addsl 1000 492536,123456"
+)
+# Progress message is edited at most this often
+PROGRESS_EDIT_SECONDS = 3.0
+
+
+async def _bulklimit(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        if update.effective_chat.type != "private":
+            await update.message.reply_text("❌ /bulklimit is only available in direct messages with the bot.")
+            return
+
+        text = update.message.text if update.message and update.message.text else ""
+        args = parse_args_safe(text, 3)
+        if not args or args[0].lower() not in LIMIT_OPS:
+            await update.message.reply_text(USAGE)
+            return
+
+        op = args[0].lower()
+        amount_str = args[1].replace(",", "").strip()
+        if not amount_str.lstrip("-").isdigit():
+            await update.message.reply_text("❌ Invalid amount.")
+            return
+        amount = int(amount_str)
+
+        access = get_user_access(int(update.effective_user.id))
+        cap = COMMAND_TO_CAP[op]
+        if not access or not access.can(cap):
+            await update.message.reply_text("❌ Command not permitted for your role")
+            return
+
+        # Resolve the target clubs (display IDs)
+        scope = args[2].lower()
+        club_id_map = context.application.bot_data.get("club_id_map") or {}
+        if scope == "all":
+            allowed = access.scopes.get(cap)
+            club_ids = sorted(club_id_map) if allowed is None else sorted(allowed)
+        elif scope == "region":
+            club_ids = sorted(access.role_clubs.get("Region Head", ()))
+            if not club_ids:
+                await update.message.reply_text("❌ You have no Region Head clubs.")
+                return
+        else:
+            parts = [clean_id(p) for p in re.split(r"[,\s;]+", " ".join(args[2:])) if p]
+            bad = [p for p in parts if not p.isdigit()]
+            if bad:
+                await update.message.reply_text(f"❌ Invalid club ID(s): {', '.join(bad)}")
+                return
+            club_ids = sorted({int(p) for p in parts})
+
+        if not club_ids:
+            await update.message.reply_text("❌ No clubs to update.")
+            return
+
+        from src.bot.bot import map_club_id
+        targets: List[Tuple[int, str]] = []
+        skipped: List[str] = []
+        for club_id in club_ids:
+            check = can_manage_club(update, op, club_id)
+            if not check["allowed"]:
+                skipped.append(f"`{club_id}` — {check.get('reason', 'Not allowed')}")
+                continue
+            try:
+                targets.append((club_id, str(await map_club_id(club_id, context))))
+            except ValueError:
+                skipped.append(f"`{club_id}` — not found in the union")
+
+        if not targets:
+            await update.message.reply_text(
+                "❌ None of these clubs can be updated." + md_listing("⏭️ *Skipped*", skipped),
+                parse_mode="Markdown",
+            )
+            return
+
+        session = context.application.bot_data.get("session")
+        if not session:
+            await update.message.reply_text("❌ Session unavailable. Please try again.")
+            return
+
+        status = await update.message.reply_text(f"⏳ /{op} {amount}: 0/{len(targets)} clubs…")
+        last_edit = time.monotonic()
+
+        async def on_progress(done: int, total: int) -> None:
+            nonlocal last_edit
+            if done < total and time.monotonic() - last_edit < PROGRESS_EDIT_SECONDS:
+                return
+            last_edit = time.monotonic()
+            await status.edit_text(f"⏳ /{op} {amount}: {done}/{total} clubs…")
+
+        results = await bulk_change_limits(session, op, targets, amount, on_progress=on_progress)
+
+        updated = [r for r in results if r.ok]
+        failed = [r for r in results if not r.ok]
+        header = "✅ *Bulk Limit Update Finished*" if not failed else "⚠️ *Bulk Limit Update Finished With Errors*"
+        field = "Win" if LIMIT_OPS[op][0] == "win" else "Loss"
+        msg = (
+            f"{header}\n\n"
+            f"• Command: /{op} {amount} (Weekly {field} Limit)\n"
+            f"• Updated: *{len(updated)}/{len(targets)}*\n"
+        )
+        if skipped:
+            msg += f"• Skipped: {len(skipped)}\n"
+        if failed:
+            msg += md_listing("❌ *Failed*", [f"`{r.club_id}` — {md_safe(str(r.error))}" for r in failed])
+        if skipped:
+            msg += md_listing("⏭️ *Skipped*", skipped)
+
+        await status.edit_text(msg, parse_mode="Markdown")
+
+    except Exception as e:
+        print("Error in /bulklimit:", e)
+        await update.message.reply_text("❌ Unexpected error while updating limits.")
+
+
+def register_bulklimit(application) -> None:
+    """
+    Usage:
+        from bot.commands.bulklimit import register_bulklimit
+        register_bulklimit(application)
+    """
+    application.add_handler(CommandHandler("bulklimit", _bulklimit))
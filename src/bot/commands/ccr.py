@@ -72,13 +72,13 @@ async def _ccr(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             return
 
         # Fresh SID from middleware (stored in bot_data by your startup)
-        sid = context.application.bot_data.get("sid")
-        if not sid:
+        session = context.application.bot_data.get("session")
+        if not session:
             await update.message.reply_text("❌ Session unavailable. Please try again.")
             return
 
-        # (clubId, sid, amount)
-        res = await claim_credit(str(backend_id), sid, amount)
+        # (clubId, sid, amount) - sid is injected by the session manager
+        res = await session.call(claim_credit, str(backend_id), amount=amount)
         if not res:
             await update.message.reply_text("❌ Failed to claim credits (no response)")
             return
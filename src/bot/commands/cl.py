@@ -3,8 +3,8 @@ from telegram.ext import ContextTypes, CommandHandler
 
 from src.utils.parse import parse_args_safe, clean_id
 from src.utils.can_manage_club import can_manage_club
-from src.library.get_club_limit import get_club_limit
-from src.library.get_club_pnl_for_club import get_club_pnl_for_club
+from src.library.club_limit_cache import club_limits
+from src.library.club_snapshot import club_snapshots
 
 async def _cl(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     try:
@@ -52,12 +52,12 @@ async def _cl(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             await update.message.reply_text(f"❌ {check.get('reason', 'Not allowed')}")
             return
 
-        sid = context.application.bot_data.get("sid")
-        if not sid:
+        session = context.application.bot_data.get("session")
+        if not session:
             await update.message.reply_text("❌ Session unavailable. Please try again.")
             return
 
-        current = await get_club_limit(str(backend_id), sid)
+        current = await club_limits.get(session, backend_id)
         if not current or not current.INFO:
             await update.message.reply_text("❌ Failed to fetch current limits ")
             return
@@ -67,9 +67,12 @@ async def _cl(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         club_name = info.nm
         win_limit = int(info.win or 0)
         loss_limit = int(info.loss or 0)
-        pnl_data = await get_club_pnl_for_club(str(backend_id), sid)
-        ring_pnl = int(pnl_data.ring_pnl or 0) if pnl_data else 0
-        tournament_pnl = int(pnl_data.tournament_pnl or 0) if pnl_data else 0
+        # P&L comes from the shared club snapshot (O(1) by cno) instead of
+        # walking /clublist page by page
+        snapshot = await club_snapshots.get(session)
+        pnl_data = snapshot.pnl_for(backend_id) if snapshot else None
+        ring_pnl = int(pnl_data["ringPnl"] or 0) if pnl_data else 0
+        tournament_pnl = int(pnl_data["tourneyPnl"] or 0) if pnl_data else 0
         total_pnl = ring_pnl + tournament_pnl
 
         msg = (
@@ -14,14 +14,22 @@ async def _help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         "• `/subsl <amt>`  — Decrease Weekly *Loss* Limit",
         "• `/setwl <amt>`  — Set Weekly *Win* Limit to a value",
         "• `/setsl <amt>`  — Set Weekly *Loss* Limit to a value",
+        "• `/bulklimit <op> <amt> all|region|<ids>` — Any of the above on many clubs (DM only)",
         "",
         "👁️ *View*",
         "• `/cl` — Show club limits *and* weekly P&L (Ring + Tournament)",
         "",
         "💳 *Credits* (Auto-detected from chat)",
         "• `/scr <amt>` — Send credits to club",
+        "• `/scrbatch <id>:<amt> ...` — Send credits to many clubs (DM only)",
         "• `/ccr <amt>` — Claim credits from club",
         "",
+        "📄 *Spreadsheets* (DM only)",
+        "• Send a `.csv`/`.xlsx` with columns `club_id, action, amount` to run many limit/credit operations; a results CSV comes back",
+        "",
+        "🛠️ *Admin*",
+        "• `/reloadroles` — Reload roles & permissions from the database",
+        "",
         "—",
         "🧩 *Syntax & Examples*",
         "`/cl`",
@@ -0,0 +1,32 @@
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+
+from src.utils.roles import has_permission
+
+
+async def _reloadroles(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        user = update.effective_user
+        if not user or not has_permission(int(user.id), "reloadroles"):
+            await update.message.reply_text("❌ Command not permitted for your role")
+            return
+
+        from src.bot.bot import refresh_roles
+        changed = await refresh_roles(force=True)
+        if changed:
+            await update.message.reply_text("✅ Roles reloaded from the database.")
+        else:
+            await update.message.reply_text("ℹ️ No role entries in the database; current roles kept.")
+
+    except Exception as e:
+        print("Error in /reloadroles:", e)
+        await update.message.reply_text("❌ Failed to reload roles.")
+
+
+def register_reloadroles(application) -> None:
+    """
+    Usage:
+        from bot.commands.reloadroles import register_reloadroles
+        register_reloadroles(application)
+    """
+    application.add_handler(CommandHandler("reloadroles", _reloadroles))
@@ -72,13 +72,13 @@ async def _scr(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             return
 
         # Session cookie (set in bot startup / refresher)
-        sid = context.application.bot_data.get("sid")
-        if not sid:
+        session = context.application.bot_data.get("session")
+        if not session:
             await update.message.reply_text("❌ Session unavailable. Please try again.")
             return
 
         # Call API
-        res = await send_credit(sid, str(backend_id), amount)
+        res = await session.call(send_credit, club_id=str(backend_id), amount=amount)
         if not res:
             await update.message.reply_text("❌ Failed to send credits (no response)")
             return
@@ -0,0 +1,117 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from telegram import Update
+from telegram.ext import ContextTypes, CommandHandler
+
+from src.utils.parse import parse_club_amounts
+from src.utils.can_manage_club import can_manage_club
+from src.utils.markdown import MAX_LISTED, md_listing, md_safe
+
+from src.library.send_credit import send_credit_batch
+
+USAGE = (
+    "Usage: /scrbatch <club_id>:<amount> ...\n"
+    "or one <club_id> <amount> per line:\n\n"
+    "/scrbatch\n492536 1000\n123456 500"
+)
+MAX_BATCH_CLUBS = 500
+
+
+async def _scrbatch(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    try:
+        if update.effective_chat.type != "private":
+            await update.message.reply_text("❌ /scrbatch is only available in direct messages with the bot.")
+            return
+
+        text = update.message.text if update.message and update.message.text else ""
+        pairs, errors = parse_club_amounts(text)
+        if errors:
+            await update.message.reply_text(
+                "❌ Could not read these entries (nothing was sent):\n" + "\n".join(errors[:MAX_LISTED])
+            )
+            return
+        if not pairs:
+            await update.message.reply_text(USAGE)
+            return
+        if len(pairs) > MAX_BATCH_CLUBS:
+            await update.message.reply_text(f"❌ Too many clubs ({len(pairs)}); the maximum is {MAX_BATCH_CLUBS}.")
+            return
+
+        counts = Counter(club_id for club_id, _ in pairs)
+        duplicates = sorted(club_id for club_id, n in counts.items() if n > 1)
+        if duplicates:
+            await update.message.reply_text(
+                "❌ Clubs listed more than once (nothing was sent): " + ", ".join(str(c) for c in duplicates)
+            )
+            return
+
+        # Validate every club before sending anything
+        from src.bot.bot import map_club_id
+        transfers: List[Tuple[str, int]] = []
+        display_for: Dict[str, int] = {}
+        rejected: List[str] = []
+        for club_id, amount in pairs:
+            check = can_manage_club(update, "scr", club_id)
+            if not check["allowed"]:
+                rejected.append(f"{club_id}: {check.get('reason', 'Not allowed')}")
+                continue
+            try:
+                backend_id = str(await map_club_id(club_id, context))
+            except ValueError as e:
+                rejected.append(f"{club_id}: {e}")
+                continue
+            transfers.append((backend_id, amount))
+            display_for[backend_id] = club_id
+        if rejected:
+            await update.message.reply_text(
+                "❌ Nothing was sent; fix these clubs first:\n" + "\n".join(rejected[:MAX_LISTED])
+            )
+            return
+
+        session = context.application.bot_data.get("session")
+        if not session:
+            await update.message.reply_text("❌ Session unavailable. Please try again.")
+            return
+
+        status = await update.message.reply_text(f"⏳ Sending credits to {len(transfers)} clubs…")
+        res = await send_credit_batch(session, transfers)
+
+        amounts = dict(transfers)
+        sent_total = sum(amounts[c] for c in res["succeeded"] if c in amounts)
+        header = "✅ *Batch Credits Sent*" if res["ok"] else "⚠️ *Batch Credits Partially Sent*"
+        if not res["succeeded"]:
+            header = "❌ *Batch Credits Failed*"
+
+        msg = (
+            f"{header}\n\n"
+            f"• Clubs: *{len(res['succeeded'])}/{len(transfers)}* succeeded\n"
+            f"• Total sent: *{sent_total}*\n"
+            f"• Requests: {res['requests']}\n"
+        )
+        if res.get("balance") is not None:
+            msg += f"• Balance: {res['balance']}\n"
+        if res["failed"]:
+            msg += md_listing("❌ *Failed*", [
+                f"`{display_for.get(c, c)}` {amounts.get(c)}" + (f" — {md_safe(m)}" if m else "")
+                for c, m in res["failed"].items()
+            ])
+        if res["unknown"]:
+            msg += md_listing("⚠️ *No response — check these before retrying*", [
+                f"`{display_for.get(c, c)}` {amounts.get(c)}" for c in res["unknown"]
+            ])
+
+        await status.edit_text(msg, parse_mode="Markdown")
+
+    except Exception as e:
+        print("Error in /scrbatch:", e)
+        await update.message.reply_text("❌ Unexpected error while sending credits.")
+
+
+def register_scrbatch(application) -> None:
+    """
+    Usage:
+        from bot.commands.scrbatch import register_scrbatch
+        register_scrbatch(application)
+    """
+    application.add_handler(CommandHandler("scrbatch", _scrbatch))
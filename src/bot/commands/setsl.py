@@ -4,8 +4,7 @@ from telegram.ext import ContextTypes, CommandHandler
 from src.utils.parse import parse_args_safe, clean_id
 from src.utils.can_manage_club import can_manage_club
 
-from src.library.get_club_limit import get_club_limit
-from src.library.set_limit import set_limit
+from src.library.limit_ops import submit_limit_op
 
 
 async def _setsl(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -75,38 +74,29 @@ async def _setsl(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             return
 
         # Fresh session from middleware (stored in bot_data)
-        sid = context.application.bot_data.get("sid")
-        if not sid:
+        session = context.application.bot_data.get("session")
+        if not session:
             await update.message.reply_text("❌ Session unavailable. Please try again.")
             return
 
-        # Fetch current limits
-        current = await get_club_limit(str(backend_id), sid)
-        if not current or not current.INFO:
-            await update.message.reply_text("❌ Failed to fetch current limits ")
-            return
-
-        info = current.INFO
-        prev_win = int(info.win or 0)
-        prev_loss = int(info.loss or 0)
-
-        # Update: keep win same, set loss to amount
-        res = await set_limit(sid, str(backend_id), prev_win, amount, 1)
-        if not res:
-            await update.message.reply_text("❌ Failed to update limits.")
+        # Read-modify-write under the club's lock; commands for the same club
+        # arriving together are folded into one write
+        change = await submit_limit_op(session, "setsl", int(club_id), str(backend_id), amount)
+        if not change.ok:
+            await update.message.reply_text(f"❌ {change.error}")
             return
 
         msg = (
             "✅ *Weekly Loss Limit Updated Successfully*\n\n"
             "🏛️ *Club Information*\n"
             f"🔑 Club ID: `{club_id}`\n"
-            f"📛 Club Name: *{info.nm}*\n\n"
+            f"📛 Club Name: *{change.name}*\n\n"
             "📊 *Previous Limits:*\n"
-            f"• 🟢 Weekly Win Limit: *{prev_win}*\n"
-            f"• 🔴 Weekly Loss Limit: *{prev_loss}*\n\n"
+            f"• 🟢 Weekly Win Limit: *{change.prev_win}*\n"
+            f"• 🔴 Weekly Loss Limit: *{change.prev_loss}*\n\n"
             "📊 *Updated Limits:*\n"
-            f"• 🟢 Weekly Win Limit: *{prev_win}*\n"
-            f"• 🔴 Weekly Loss Limit: *{amount}*"
+            f"• 🟢 Weekly Win Limit: *{change.prev_win}*\n"
+            f"• 🔴 Weekly Loss Limit: *{change.new_loss}*"
         )
         await update.message.reply_text(msg, parse_mode="Markdown")
 
@@ -0,0 +1,220 @@
+import asyncio
+import csv
+import io
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import ContextTypes, MessageHandler, filters
+
+from src.utils.can_manage_club import can_manage_club
+from src.utils.parse import clean_id
+from src.utils.roles import COMMAND_TO_CAP, get_user_access
+from src.utils.spreadsheet import iter_sheet_rows
+
+from src.library.limit_ops import LIMIT_OPS, run_limit_ops
+from src.library.send_credit import send_credit_batch
+
+# Columns (header row, any order, case-insensitive)
+COLUMNS = ("club_id", "action", "amount")
+CREDIT_ACTION = "scr"
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+MAX_UPLOAD_ROWS = 2000
+PROGRESS_EDIT_SECONDS = 3.0
+
+USAGE = (
+    "📄 Send a .csv or .xlsx file with a header row:\n"
+    "club_id, action, amount\n\n"
+    "action: addwl, subwl, setwl, addsl, subsl, setsl or scr (send credits)"
+)
+
+# (row number, club_id, action, amount) as read from the sheet
+PlanRow = Tuple[int, str, str, str]
+
+
+def _read_plan(path: str) -> Tuple[List[PlanRow], Optional[str]]:
+    """Stream the sheet row by row; returns (rows, error)."""
+    rows: List[PlanRow] = []
+    columns: Optional[Dict[str, int]] = None
+    for row_no, cells in enumerate(iter_sheet_rows(path), 1):
+        if not any(cells):
+            continue
+        if columns is None:
+            header = [c.strip().lower().replace(" ", "_") for c in cells]
+            missing = [c for c in COLUMNS if c not in header]
+            if missing:
+                return [], f"Missing column(s): {', '.join(missing)}"
+            columns = {c: header.index(c) for c in COLUMNS}
+            continue
+        if len(rows) >= MAX_UPLOAD_ROWS:
+            return [], f"Too many rows; the maximum is {MAX_UPLOAD_ROWS}"
+        values = [cells[columns[c]] if columns[c] < len(cells) else "" for c in COLUMNS]
+        rows.append((row_no, *values))
+    if columns is None:
+        return [], "The file is empty"
+    return rows, None
+
+
+async def _upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    path = None
+    try:
+        # Only users who may change limits or send credits get past here;
+        # nothing is downloaded for anyone else
+        access = get_user_access(int(update.effective_user.id))
+        if not access or not (access.can(COMMAND_TO_CAP["setwl"]) or access.can(COMMAND_TO_CAP[CREDIT_ACTION])):
+            await update.message.reply_text("❌ File uploads are not permitted for your role")
+            return
+
+        doc = update.message.document
+        if doc.file_size and doc.file_size > MAX_UPLOAD_BYTES:
+            await update.message.reply_text(f"❌ File too large (max {MAX_UPLOAD_BYTES // (1024 * 1024)} MB).")
+            return
+
+        suffix = ".xlsx" if (doc.file_name or "").lower().endswith(".xlsx") else ".csv"
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        tg_file = await doc.get_file()
+        await tg_file.download_to_drive(path)
+
+        plan, error = await asyncio.to_thread(_read_plan, path)
+        if error:
+            await update.message.reply_text(f"❌ {error}\n\n{USAGE}")
+            return
+        if not plan:
+            await update.message.reply_text(f"❌ No rows to process.\n\n{USAGE}")
+            return
+
+        # Validate every row against the cached club index and the user's scope
+        club_id_map = context.application.bot_data.get("club_id_map") or {}
+        outcome: Dict[int, Tuple[str, str]] = {}  # row -> (status, detail)
+        limit_ops: List[Tuple[int, str, str, int]] = []
+        limit_rows: List[int] = []
+        credits: Dict[str, Tuple[int, int]] = {}  # backend id -> (row, amount)
+        for row_no, club_str, action, amount_str in plan:
+            action = action.lower()
+            club_str = clean_id(club_str)
+            amount_str = amount_str.replace(",", "").strip()
+            if action not in LIMIT_OPS and action != CREDIT_ACTION:
+                outcome[row_no] = ("invalid", f"unknown action '{action}'")
+                continue
+            if not (club_str.isascii() and club_str.isdigit()):
+                outcome[row_no] = ("invalid", "invalid club_id")
+                continue
+            try:
+                amount = int(amount_str)
+            except ValueError:
+                amount = None
+            if amount is None or (action == CREDIT_ACTION and amount <= 0):
+                outcome[row_no] = ("invalid", "invalid amount")
+                continue
+            club_id = int(club_str)
+            backend_id = club_id_map.get(club_id)
+            if backend_id is None:
+                outcome[row_no] = ("invalid", "club not found in the union")
+                continue
+            check = can_manage_club(update, action, club_id)
+            if not check["allowed"]:
+                outcome[row_no] = ("invalid", check.get("reason") or "not allowed")
+                continue
+            if action == CREDIT_ACTION:
+                if str(backend_id) in credits:
+                    outcome[row_no] = ("invalid", "duplicate credit row for this club")
+                    continue
+                credits[str(backend_id)] = (row_no, amount)
+            else:
+                limit_ops.append((club_id, str(backend_id), action, amount))
+                limit_rows.append(row_no)
+
+        total = len(limit_ops) + len(credits)
+        if not total:
+            await update.message.reply_document(
+                document=_results_csv(plan, outcome),
+                filename="results.csv",
+                caption=f"❌ No valid rows ({len(outcome)} invalid).",
+            )
+            return
+
+        session = context.application.bot_data.get("session")
+        if not session:
+            await update.message.reply_text("❌ Session unavailable. Please try again.")
+            return
+
+        status = await update.message.reply_text(f"⏳ Processing {total} rows…")
+        last_edit = time.monotonic()
+
+        async def on_progress(done: int, ops_total: int) -> None:
+            nonlocal last_edit
+            if done < ops_total and time.monotonic() - last_edit < PROGRESS_EDIT_SECONDS:
+                return
+            last_edit = time.monotonic()
+            await status.edit_text(f"⏳ Limits {done}/{ops_total}, credits {len(credits)} queued…")
+
+        async def no_credits():
+            return None
+
+        limit_results, credit_result = await asyncio.gather(
+            run_limit_ops(session, limit_ops, on_progress=on_progress),
+            send_credit_batch(session, [(b, amt) for b, (_, amt) in credits.items()]) if credits else no_credits(),
+        )
+
+        for row_no, change in zip(limit_rows, limit_results):
+            if change.ok:
+                outcome[row_no] = ("ok", f"win {change.prev_win} -> {change.new_win}, loss {change.prev_loss} -> {change.new_loss}")
+            else:
+                outcome[row_no] = ("failed", change.error or "failed")
+        if credit_result:
+            for backend_id in credit_result["succeeded"]:
+                if backend_id in credits:
+                    outcome[credits[backend_id][0]] = ("ok", "credits sent")
+            for backend_id, message in credit_result["failed"].items():
+                if backend_id in credits:
+                    outcome[credits[backend_id][0]] = ("failed", message or "failed")
+            for backend_id in credit_result["unknown"]:
+                if backend_id in credits:
+                    outcome[credits[backend_id][0]] = ("unknown", "no response; check before retrying")
+
+        counts: Dict[str, int] = {}
+        for state, _ in outcome.values():
+            counts[state] = counts.get(state, 0) + 1
+        summary = ", ".join(f"{n} {state}" for state, n in sorted(counts.items()))
+        await status.edit_text(f"✅ Done: {summary}")
+        await update.message.reply_document(
+            document=_results_csv(plan, outcome),
+            filename="results.csv",
+            caption=f"📄 Results for {len(plan)} rows: {summary}",
+        )
+
+    except Exception as e:
+        print("Error in document upload:", e)
+        await update.message.reply_text("❌ Unexpected error while processing the file.")
+    finally:
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _results_csv(plan: List[PlanRow], outcome: Dict[int, Tuple[str, str]]) -> io.BytesIO:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["row", "club_id", "action", "amount", "status", "detail"])
+    for row_no, club_str, action, amount_str in plan:
+        state, detail = outcome.get(row_no, ("skipped", ""))
+        writer.writerow([row_no, club_str, action, amount_str, state, detail])
+    return io.BytesIO(out.getvalue().encode("utf-8-sig"))
+
+
+def register_upload(application) -> None:
+    """
+    Usage:
+        from bot.commands.upload import register_upload
+        register_upload(application)
+    """
+    application.add_handler(MessageHandler(
+        filters.ChatType.PRIVATE
+        & (filters.Document.FileExtension("csv") | filters.Document.FileExtension("xlsx")),
+        _upload,
+    ))
@@ -14,9 +14,14 @@ commands = [
     BotCommand("addsl", "Add to Weekly Loss Limit"),
     BotCommand("subsl", "Subtract from Weekly Loss Limit"),
     BotCommand("setsl", "Set Weekly Loss Limit"),
+    BotCommand("bulklimit", "Change limits on many clubs at once"),
 
     # Credit management (auto-detected from chat)
     BotCommand("scr", "Send credits to this club"),
+    BotCommand("scrbatch", "Send credits to many clubs at once"),
     BotCommand("ccr", "Claim credits from this club"),
+
+    # Administration
+    BotCommand("reloadroles", "Reload roles and permissions from the database"),
 ]
 
@@ -0,0 +1,163 @@
+import asyncio
+import itertools
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from src.utils.rate_limit import PRIORITY_INTERACTIVE, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Telegram limits: ~30 msg/s overall, ~1 msg/s per chat, 20 msg/min per group
+GLOBAL_RATE_PER_SECOND = 30.0
+PRIVATE_CHAT_RATE_PER_SECOND = 1.0
+GROUP_CHAT_RATE_PER_SECOND = 20.0 / 60.0
+PRIVATE_CHAT_BURST = 2
+GROUP_CHAT_BURST = 3
+
+WORKERS = 8
+MAX_RETRIES = 3
+IDLE_BUCKET_SECONDS = 300
+
+TelegramResult = Union[bool, Dict[str, Any], List[Dict[str, Any]]]
+
+
+class _Request:
+    __slots__ = ("callback", "args", "kwargs", "chat_id", "future", "attempts")
+
+    def __init__(self, callback, args, kwargs, chat_id, future):
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.chat_id = chat_id
+        self.future = future
+        self.attempts = 0
+
+
+class OutboundRateLimiter(BaseRateLimiter[int]):
+    """
+    Central outbound queue for every Bot API call that targets a chat.
+
+    Requests wait in one priority queue (interactive replies before alerts,
+    FIFO within a priority) and are sent by concurrent workers once both the
+    global and the per-chat token buckets allow it. A request whose chat is
+    not ready yet is parked and re-queued when it will be, so one busy chat
+    never stalls the others. RetryAfter blocks that chat for `retry_after`
+    and re-queues the request (up to MAX_RETRIES). Calls without a chat_id
+    (getUpdates, setMyCommands, ...) bypass the queue.
+    """
+
+    def __init__(self, workers: int = WORKERS, max_retries: int = MAX_RETRIES):
+        self.workers = workers
+        self.max_retries = max_retries
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._global = TokenBucket(GLOBAL_RATE_PER_SECOND, GLOBAL_RATE_PER_SECOND)
+        self._chats: Dict[Any, TokenBucket] = {}
+
+    async def initialize(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("Outbound queue started with %d workers", self.workers)
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) > 10_000:
+                self._prune()
+            is_group = isinstance(chat_id, str) or int(chat_id) < 0
+            if is_group:
+                bucket = TokenBucket(GROUP_CHAT_RATE_PER_SECOND, GROUP_CHAT_BURST)
+            else:
+                bucket = TokenBucket(PRIVATE_CHAT_RATE_PER_SECOND, PRIVATE_CHAT_BURST)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - IDLE_BUCKET_SECONDS
+        for chat_id in [c for c, b in self._chats.items() if b.updated < cutoff and b.blocked_until < cutoff]:
+            del self._chats[chat_id]
+
+    def _enqueue(self, priority: int, seq: int, request: _Request) -> None:
+        if not request.future.done():
+            self._queue.put_nowait((priority, seq, request))
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, TelegramResult]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> TelegramResult:
+        chat_id = data.get("chat_id")
+        if chat_id is None or self._queue is None:
+            return await callback(*args, **kwargs)
+
+        priority = PRIORITY_INTERACTIVE if rate_limit_args is None else int(rate_limit_args)
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(priority, next(self._seq), _Request(callback, args, kwargs, chat_id, future))
+        return await future
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            priority, seq, request = await self._queue.get()
+            try:
+                if request.future.done():  # caller gave up (cancelled)
+                    continue
+
+                bucket = self._chat_bucket(request.chat_id)
+                wait = bucket.wait_time(time.monotonic())
+                if wait > 0:
+                    loop.call_later(wait, self._enqueue, priority, seq, request)
+                    continue
+
+                while (global_wait := self._global.wait_time(time.monotonic())) > 0:
+                    await asyncio.sleep(global_wait)
+                self._global.take()
+                bucket.take()
+
+                try:
+                    result = await request.callback(*request.args, **request.kwargs)
+                except RetryAfter as e:
+                    retry_after = _seconds(e.retry_after)
+                    bucket.blocked_until = time.monotonic() + retry_after
+                    request.attempts += 1
+                    if request.attempts > self.max_retries:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                    else:
+                        logger.warning(
+                            "Flood control for chat %s: retrying in %.1fs (attempt %d)",
+                            request.chat_id, retry_after, request.attempts,
+                        )
+                        loop.call_later(retry_after, self._enqueue, priority, seq, request)
+                except Exception as e:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                else:
+                    if not request.future.done():
+                        request.future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+
+def _seconds(retry_after: Union[int, float, timedelta]) -> float:
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
@@ -13,8 +13,46 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 DB_TABLE = os.getenv("DB_TABLE", "chat_to_club")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# Change-tracking column on DB_TABLE used for incremental mapping sync
+DB_UPDATED_AT_COLUMN = os.getenv("DB_UPDATED_AT_COLUMN", "updated_at")
+# Role store tables (fall back to the defaults in src/utils/roles.py if empty/missing)
+DB_ROLES_TABLE = os.getenv("DB_ROLES_TABLE", "user_roles")
+DB_PERMISSIONS_TABLE = os.getenv("DB_PERMISSIONS_TABLE", "role_permissions")
+ROLE_REFRESH_SECONDS = int(os.getenv("ROLE_REFRESH_SECONDS", "60"))
+# Per-club / per-region alert rules (fall back to the ALERT_* defaults if empty/missing)
+DB_ALERT_RULES_TABLE = os.getenv("DB_ALERT_RULES_TABLE", "alert_rules")
+DB_CLUB_REGIONS_TABLE = os.getenv("DB_CLUB_REGIONS_TABLE", "club_regions")
+ALERT_RULES_REFRESH_SECONDS = int(os.getenv("ALERT_RULES_REFRESH_SECONDS", "60"))
 
 # ClubGG login configuration
 UNION_LOGIN_ID = os.getenv("UNION_LOGIN_ID", "")
 UNION_LOGIN_PWD = os.getenv("UNION_LOGIN_PWD", "")
-CAPSOLVER_API_KEY = os.getenv("CAPSOLVER_API_KEY", "")
\ No newline at end of file
+CAPSOLVER_API_KEY = os.getenv("CAPSOLVER_API_KEY", "")
+
+# ClubGG session rotation (seconds)
+SESSION_MAX_AGE_SECONDS = int(os.getenv("SESSION_MAX_AGE_SECONDS", "3600"))
+SESSION_PREWARM_SECONDS = int(os.getenv("SESSION_PREWARM_SECONDS", "600"))
+SESSION_CHECK_INTERVAL_SECONDS = int(os.getenv("SESSION_CHECK_INTERVAL_SECONDS", "300"))
+# Last good connect.sid is kept here so restarts can skip the captcha/MFA login
+SESSION_FILE = os.getenv("SESSION_FILE", ".clubgg_session.json")
+
+# Shared club snapshot (from /clublimit) reused by /cl, mappings and alerts.
+# The alert sweep refreshes it every minute; keep this above that interval
+# (plus sweep time) so /cl reads the sweep's snapshot instead of refetching
+CLUB_SNAPSHOT_TTL_SECONDS = int(os.getenv("CLUB_SNAPSHOT_TTL_SECONDS", "90"))
+# Per-club limits shown by /cl are reused this long
+CLUB_LIMIT_CACHE_TTL_SECONDS = int(os.getenv("CLUB_LIMIT_CACHE_TTL_SECONDS", "30"))
+
+# Alert cooldowns are snapshotted here and restored at boot
+ALERT_STATE_FILE = os.getenv("ALERT_STATE_FILE", ".alert_cooldowns.json")
+# Local per-club history of every sweep (SQLite file; empty disables it)
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", ".club_history.sqlite3")
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "365"))
+
+# Limit-usage warning tiers in percent; only the highest tier reached fires
+ALERT_LOSS_TIERS = tuple(sorted(float(t) for t in os.getenv("ALERT_LOSS_TIERS", "75,90,100").split(",") if t.strip()))
+ALERT_WIN_TIERS = tuple(sorted(float(t) for t in os.getenv("ALERT_WIN_TIERS", "75,90,100").split(",") if t.strip()))
+
+# Group every alert a chat gets in one sweep into a single message (set to 0 for one message per alert)
+ALERT_DIGEST_MODE = os.getenv("ALERT_DIGEST_MODE", "1").strip().lower() in ("1", "true", "yes", "on")
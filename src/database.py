@@ -1,7 +1,14 @@
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 import pymysql
-from src.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_TABLE
+from src.config import (
+    DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_TABLE, DB_POOL_SIZE, DB_UPDATED_AT_COLUMN,
+    DB_ROLES_TABLE, DB_PERMISSIONS_TABLE, DB_ALERT_RULES_TABLE, DB_CLUB_REGIONS_TABLE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,50 +24,191 @@ DB_CONFIG = {
     'write_timeout': 10
 }
 
+# Idle connections older than this are pinged before being handed out
+HEALTH_CHECK_AFTER_SECONDS = 30
+
+# MySQL client errors meaning the connection itself is gone (safe to retry)
+CONNECTION_LOST_CODES = {2003, 2006, 2013, 2055}
+# MySQL ER_BAD_FIELD_ERROR ("Unknown column") / ER_NO_SUCH_TABLE
+UNKNOWN_COLUMN_CODE = 1054
+NO_SUCH_TABLE_CODE = 1146
+# Optional tables that do not exist are looked for again this often
+MISSING_TABLE_RETRY_SECONDS = 600
+
+
+def _is_missing_column(e: Exception) -> bool:
+    """True if the query failed because a column does not exist (MySQL 1054, or SQLite's "no such column")."""
+    if isinstance(e, pymysql.err.MySQLError):
+        return bool(e.args) and e.args[0] == UNKNOWN_COLUMN_CODE
+    return "no such column" in str(e).lower()
+
+
+def _is_missing_table(e: Exception) -> bool:
+    """True if the query failed because a table does not exist (MySQL 1146, or SQLite's "no such table")."""
+    if isinstance(e, pymysql.err.MySQLError):
+        return bool(e.args) and e.args[0] == NO_SUCH_TABLE_CODE
+    return "no such table" in str(e).lower()
+
+def _mysql_connect():
+    return pymysql.connect(**DB_CONFIG)
+
 class DatabaseManager:
-    def __init__(self):
-        self.connection = None
-    
-    def get_connection(self):
+    """
+    Bounded pool of DB-API connections used from async code.
+
+    Blocking driver calls run in worker threads, so the event loop never
+    waits on MySQL. At most `pool_size` queries run at once; extra callers
+    wait for a free connection. Idle connections are health-checked before
+    reuse and a query that fails on a stale connection is retried once on
+    a fresh one.
+
+    `connect` and `placeholder` make it usable against other drivers, e.g.
+    a local SQLite stand-in:
+        DatabaseManager(connect=lambda: sqlite3.connect("t.db", check_same_thread=False),
+                        placeholder="?")
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any] = _mysql_connect,
+        pool_size: int = DB_POOL_SIZE,
+        placeholder: str = "%s",
+    ):
+        self._connect = connect
+        self.pool_size = max(1, pool_size)
+        self.placeholder = placeholder
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        return self._slots
+
+    def _open(self):
         try:
-            if self.connection is None or not self.connection.open:
-                self.connection = pymysql.connect(**DB_CONFIG)
-                logger.info("Database connected")
-            return self.connection
+            connection = self._connect()
+            logger.info("Database connected")
+            return connection
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
-    
-    def close_connection(self):
-        if self.connection and self.connection.open:
-            self.connection.close()
-            logger.info("Database disconnected")
-    
-    def execute_query(self, query: str, params: tuple = None) -> list:
+
+    @staticmethod
+    def _close_quietly(connection) -> None:
         try:
-            connection = self.get_connection()
-            with connection.cursor(pymysql.cursors.DictCursor) as cursor:
-                cursor.execute(query, params)
-                return cursor.fetchall()
-        except Exception as e:
-            logger.error(f"Query failed: {e}")
-            raise
-    
-    def get_chat_club_mapping(self) -> Dict[int, int]:
+            connection.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _ping(connection) -> None:
+        ping = getattr(connection, "ping", None)
+        if ping is not None:
+            ping(reconnect=True)
+            return
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _checkout(self, connection, idle_since: float):
+        """Runs in a worker thread: reuse (after a health check) or connect."""
+        if connection is not None and time.monotonic() - idle_since >= HEALTH_CHECK_AFTER_SECONDS:
+            try:
+                self._ping(connection)
+            except Exception as e:
+                logger.warning(f"Dropping stale database connection: {e}")
+                self._close_quietly(connection)
+                connection = None
+        return connection if connection is not None else self._open()
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        Borrow a pooled connection. It goes back to the pool afterwards,
+        also after an ordinary SQL error; it is discarded only when the
+        connection itself failed or the caller was cancelled mid-query.
+        """
+        async with self._semaphore():
+            connection, idle_since = self._idle.pop() if self._idle else (None, 0.0)
+            connection = await asyncio.to_thread(self._checkout, connection, idle_since)
+            try:
+                yield connection
+            except Exception as e:
+                if self._is_connection_error(e):
+                    await asyncio.to_thread(self._close_quietly, connection)
+                else:
+                    self._idle.append((connection, time.monotonic()))
+                raise
+            except BaseException:
+                await asyncio.to_thread(self._close_quietly, connection)
+                raise
+            else:
+                self._idle.append((connection, time.monotonic()))
+
+    @staticmethod
+    def _run(connection, query: str, params: Optional[tuple]) -> List[Dict[str, Any]]:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, params or ())
+            if cursor.description is None:
+                # Write statement; no-op under MySQL autocommit
+                connection.commit()
+                return []
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    async def execute_query(self, query: str, params: tuple = None) -> list:
+        for attempt in (1, 2):
+            try:
+                async with self.connection() as connection:
+                    return await asyncio.to_thread(self._run, connection, query, params)
+            except Exception as e:
+                if attempt == 1 and self._is_connection_error(e):
+                    logger.warning(f"Query hit a dead connection, retrying: {e}")
+                    continue
+                if _is_missing_table(e):
+                    # Optional tables; the caller decides whether this is an error
+                    logger.debug(f"Query failed: {e}")
+                else:
+                    logger.error(f"Query failed: {e}")
+                raise
+        return []
+
+    @staticmethod
+    def _is_connection_error(e: Exception) -> bool:
+        if isinstance(e, pymysql.err.InterfaceError):
+            return True
+        return isinstance(e, pymysql.err.OperationalError) and bool(e.args) and e.args[0] in CONNECTION_LOST_CODES
+
+    async def close(self) -> None:
+        closed = len(self._idle)
+        while self._idle:
+            connection, _ = self._idle.pop()
+            await asyncio.to_thread(self._close_quietly, connection)
+        if closed:
+            logger.info("Database disconnected")
+
+    async def get_chat_club_mapping(self) -> Dict[int, int]:
         query = f"SELECT chat_id, club_id FROM {DB_TABLE}"
         try:
-            results = self.execute_query(query)
+            results = await self.execute_query(query)
             mapping = {row['chat_id']: row['club_id'] for row in results}
             logger.info(f"Loaded {len(mapping)} chat-club mappings")
             return mapping
         except Exception as e:
             logger.error(f"Failed to load chat-club mapping: {e}")
             return {}
-    
-    def get_club_id_by_chat_id(self, chat_id: int) -> Optional[int]:
-        query = f"SELECT club_id FROM {DB_TABLE} WHERE chat_id = %s"
+
+    async def get_club_id_by_chat_id(self, chat_id: int) -> Optional[int]:
+        query = f"SELECT club_id FROM {DB_TABLE} WHERE chat_id = {self.placeholder}"
         try:
-            results = self.execute_query(query, (chat_id,))
+            results = await self.execute_query(query, (chat_id,))
             if results:
                 return results[0]['club_id']
             return None
@@ -68,4 +216,293 @@ class DatabaseManager:
             logger.error(f"Failed to get club_id for chat_id {chat_id}: {e}")
             return None
 
-db_manager = DatabaseManager()
\ No newline at end of file
+class ChatClubSync:
+    """
+    Keeps `mapping` (chat_id -> club_id) in step with DB_TABLE.
+
+    After one full load, each sync only fetches rows whose change column
+    (DB_UPDATED_AT_COLUMN) is at or past the last watermark and merges
+    them in. A COUNT(*) on every sync catches deletes, which a timestamp
+    watermark cannot see, and triggers a full reload. Tables without the
+    column fall back to full reloads.
+
+    `club_chats` is the reverse index (club_id -> [chat_ids]); it is
+    rebuilt whenever `mapping` changes.
+    """
+
+    def __init__(self, db: "DatabaseManager", column: str = DB_UPDATED_AT_COLUMN):
+        self.db = db
+        self.column = column
+        self.mapping: Dict[int, int] = {}
+        self.club_chats: Dict[int, List[int]] = {}
+        self.watermark: Any = None
+        self.incremental = bool(column)
+        self._loaded = False
+
+    async def sync(self) -> bool:
+        """Bring `mapping` up to date. Returns True if it changed."""
+        if not self._loaded or not self.incremental or self.watermark is None:
+            return await self._full_load()
+
+        stats = await self.db.execute_query(f"SELECT COUNT(*) AS n FROM {DB_TABLE}")
+        total = int(stats[0]["n"]) if stats else 0
+
+        query = (
+            f"SELECT chat_id, club_id, {self.column} AS changed_at FROM {DB_TABLE} "
+            f"WHERE {self.column} >= {self.db.placeholder}"
+        )
+        rows = await self.db.execute_query(query, (self.watermark,))
+        changed = False
+        for row in rows:
+            if self.mapping.get(row["chat_id"]) != row["club_id"]:
+                self.mapping[row["chat_id"]] = row["club_id"]
+                changed = True
+            if row["changed_at"] is not None and row["changed_at"] > self.watermark:
+                self.watermark = row["changed_at"]
+
+        if len(self.mapping) != total:
+            logger.info(f"Chat-club row count changed ({len(self.mapping)} -> {total}); full reload")
+            return await self._full_load()
+
+        if changed:
+            logger.info(f"Merged {len(rows)} changed chat-club rows")
+            self._rebuild_index()
+        return changed
+
+    def _rebuild_index(self) -> None:
+        index: Dict[int, List[int]] = {}
+        for chat_id, club_id in self.mapping.items():
+            index.setdefault(club_id, []).append(chat_id)
+        self.club_chats.clear()
+        self.club_chats.update(index)
+
+    async def _full_load(self) -> bool:
+        rows = None
+        if self.incremental:
+            try:
+                rows = await self.db.execute_query(
+                    f"SELECT chat_id, club_id, {self.column} AS changed_at FROM {DB_TABLE}"
+                )
+            except Exception as e:
+                # Only a missing column disables incremental sync; anything
+                # else (DB down, timeout) propagates and the next sync retries
+                if not _is_missing_column(e):
+                    raise
+                logger.warning(f"No usable {self.column} column on {DB_TABLE}; using full reloads: {e}")
+                self.incremental = False
+        if rows is None:
+            rows = await self.db.execute_query(f"SELECT chat_id, club_id FROM {DB_TABLE}")
+
+        mapping = {row["chat_id"]: row["club_id"] for row in rows}
+        stamps = [row["changed_at"] for row in rows if row.get("changed_at") is not None]
+        self.watermark = max(stamps) if stamps else None
+
+        changed = mapping != self.mapping or not self._loaded
+        # Update in place so holders of the dict (bot_data) see the result
+        self.mapping.clear()
+        self.mapping.update(mapping)
+        self._loaded = True
+        if changed:
+            self._rebuild_index()
+        logger.info(f"Loaded {len(mapping)} chat-club mappings")
+        return changed
+
+class TableSignature:
+    """
+    Cheap change signature for a set of tables: COUNT(*) and MAX of the
+    change column per table. `read()` returns None when there is no usable
+    column, and callers then compare the rows themselves. Only a missing
+    column switches that on for good; other errors propagate so the next
+    refresh tries again.
+
+    The tables are optional: `query()` returns None for a table that does
+    not exist (logged once) and skips it for MISSING_TABLE_RETRY_SECONDS
+    before looking again, so callers fall back to built-in defaults.
+    """
+
+    def __init__(self, db: "DatabaseManager", tables: Tuple[str, ...], column: str, label: str):
+        self.db = db
+        self.tables = tables
+        self.column = column
+        self.label = label
+        self._missing: Dict[str, float] = {}  # table -> when to look for it again
+
+    async def query(self, table: str, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Rows of `query` on `table`, or None if the table does not exist."""
+        retry_at = self._missing.get(table)
+        if retry_at is not None and time.monotonic() < retry_at:
+            return None
+        try:
+            rows = await self.db.execute_query(query)
+        except Exception as e:
+            if not _is_missing_table(e):
+                raise
+            if retry_at is None:
+                logger.warning(f"{table} does not exist; using built-in defaults: {e}")
+            self._missing[table] = time.monotonic() + MISSING_TABLE_RETRY_SECONDS
+            return None
+        if self._missing.pop(table, None) is not None:
+            logger.info(f"{table} now exists; loading it")
+        return rows
+
+    async def read(self) -> Any:
+        if not self.column:
+            return None
+        try:
+            sig = []
+            for table in self.tables:
+                rows = await self.query(
+                    table, f"SELECT COUNT(*) AS n, MAX({self.column}) AS changed_at FROM {table}"
+                )
+                sig.append((rows[0]["n"], rows[0]["changed_at"]) if rows else None)
+            return tuple(sig)
+        except Exception as e:
+            if not _is_missing_column(e):
+                raise
+            logger.warning(f"{self.label} have no usable {self.column}; comparing contents instead: {e}")
+            self.column = ""
+            return None
+
+class RoleSync:
+    """
+    Loads user roles and role permissions from the database.
+
+    Tables:
+        DB_ROLES_TABLE:       user_id, role, clubs (comma-separated display IDs or NULL)
+        DB_PERMISSIONS_TABLE: role, capability
+
+    Each sync first reads a cheap signature (COUNT(*) and MAX of the change
+    column for both tables) and only re-reads the rows when it moved. If the
+    change column is missing, the rows are read every time and compared with
+    the last load instead.
+    """
+
+    def __init__(
+        self,
+        db: "DatabaseManager",
+        roles_table: str = DB_ROLES_TABLE,
+        permissions_table: str = DB_PERMISSIONS_TABLE,
+        column: str = DB_UPDATED_AT_COLUMN,
+    ):
+        self.db = db
+        self.roles_table = roles_table
+        self.permissions_table = permissions_table
+        self.signature = TableSignature(db, (roles_table, permissions_table), column, "Role tables")
+        self._signature: Any = None
+        self._last: Any = None
+
+    @staticmethod
+    def _parse_clubs(value: Any) -> List[int]:
+        if value is None:
+            return []
+        clubs = []
+        for part in str(value).replace(";", ",").split(","):
+            part = part.strip()
+            if part.isdigit():
+                clubs.append(int(part))
+        return clubs
+
+    async def sync(self, force: bool = False) -> Optional[Tuple[List[Dict[str, Any]], Optional[Dict[str, List[str]]]]]:
+        """
+        Returns (user_roles, permissions) when the stored roles changed since
+        the last call (permissions is None if that table is empty), else None.
+        """
+        signature = await self.signature.read()
+        if not force and signature is not None and signature == self._signature:
+            return None
+
+        # A missing table reads as empty: built-in roles/permissions apply
+        role_rows = await self.signature.query(
+            self.roles_table, f"SELECT user_id, role, clubs FROM {self.roles_table}"
+        )
+        perm_rows = await self.signature.query(
+            self.permissions_table, f"SELECT role, capability FROM {self.permissions_table}"
+        ) or []
+
+        user_roles: List[Dict[str, Any]] = []
+        for row in role_rows or []:
+            entry: Dict[str, Any] = {"userId": int(row["user_id"]), "role": str(row["role"])}
+            clubs = self._parse_clubs(row.get("clubs"))
+            if clubs:
+                entry["clubs"] = clubs
+            user_roles.append(entry)
+
+        permissions: Dict[str, List[str]] = {}
+        for row in perm_rows:
+            permissions.setdefault(str(row["role"]), []).append(str(row["capability"]))
+
+        self._signature = signature
+        loaded = (user_roles, permissions or None)
+        if not force and loaded == self._last:
+            return None
+        self._last = loaded
+
+        if not user_roles:
+            if role_rows is not None:
+                logger.warning(f"{self.roles_table} is empty; keeping current roles")
+            return None
+        logger.info(f"Loaded {len(user_roles)} role entries, {len(permissions)} role permission sets")
+        return loaded
+
+class AlertRuleSync:
+    """
+    Loads alert rule definitions and club regions from the database.
+
+    Tables:
+        DB_ALERT_RULES_TABLE:  scope ('default' | 'region' | 'club'), scope_id
+                               (region name or club display ID), loss_tiers,
+                               win_tiers, pnl_threshold, cooldown_minutes,
+                               enabled (NULL columns inherit)
+        DB_CLUB_REGIONS_TABLE: club_id (display ID), region
+
+    Change detection is shared with RoleSync (TableSignature): a COUNT/MAX
+    signature per table, falling back to comparing the rows only if the
+    change column is missing.
+    Unlike roles, empty tables are valid and mean "built-in defaults".
+    """
+
+    def __init__(
+        self,
+        db: "DatabaseManager",
+        rules_table: str = DB_ALERT_RULES_TABLE,
+        regions_table: str = DB_CLUB_REGIONS_TABLE,
+        column: str = DB_UPDATED_AT_COLUMN,
+    ):
+        self.db = db
+        self.rules_table = rules_table
+        self.regions_table = regions_table
+        self.signature = TableSignature(db, (rules_table, regions_table), column, "Alert rule tables")
+        self._signature: Any = None
+        self._last: Any = None
+
+    async def sync(self, force: bool = False) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """
+        Returns (rule_rows, region_rows) when the stored rules changed since
+        the last call, else None.
+        """
+        signature = await self.signature.read()
+        if not force and signature is not None and signature == self._signature:
+            return None
+
+        # Both tables are optional; a missing one reads as empty (defaults)
+        rule_rows = await self.signature.query(
+            self.rules_table,
+            f"SELECT scope, scope_id, loss_tiers, win_tiers, pnl_threshold, cooldown_minutes, enabled "
+            f"FROM {self.rules_table}",
+        ) or []
+        region_rows = await self.signature.query(
+            self.regions_table, f"SELECT club_id, region FROM {self.regions_table}"
+        ) or []
+
+        self._signature = signature
+        loaded = (rule_rows, region_rows)
+        if not force and loaded == self._last:
+            return None
+        self._last = loaded
+        logger.info(f"Loaded {len(rule_rows)} alert rules, {len(region_rows)} club regions")
+        return loaded
+
+db_manager = DatabaseManager()
+chat_club_sync = ChatClubSync(db_manager)
+role_sync = RoleSync(db_manager)
+alert_rule_sync = AlertRuleSync(db_manager)
@@ -0,0 +1,90 @@
+# src/library/alert_cooldowns.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CooldownKey = Tuple[int, str]  # (club_id, alert_type)
+
+
+class AlertCooldownStore:
+    """
+    Last-sent time per (club_id, alert_type), as epoch seconds.
+
+    Entries older than `ttl` can no longer block an alert, so `evict()` drops
+    them; the store therefore only ever holds alerts from the last cooldown
+    window. `save()`/`load()` snapshot it to a JSON file so a restart does
+    not re-send every alert that was still cooling down.
+    """
+
+    def __init__(self, cooldown_seconds: float, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.cooldown = float(cooldown_seconds)
+        self.ttl = float(ttl if ttl is not None else cooldown_seconds)
+        self.path = path
+        self._last: Dict[CooldownKey, float] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._last)
+
+    def next_allowed(self, club_id: int, alert_type: str, cooldown: Optional[float] = None) -> float:
+        last = self._last.get((int(club_id), alert_type))
+        if last is None:
+            return 0.0
+        return last + (self.cooldown if cooldown is None else cooldown)
+
+    def should_send(self, club_id: int, alert_type: str, cooldown: Optional[float] = None, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now >= self.next_allowed(club_id, alert_type, cooldown)
+
+    def record(self, club_id: int, alert_type: str, now: Optional[float] = None) -> None:
+        self._last[(int(club_id), alert_type)] = time.time() if now is None else now
+        self._dirty = True
+
+    def evict(self, now: Optional[float] = None) -> int:
+        cutoff = (time.time() if now is None else now) - self.ttl
+        expired = [key for key, ts in self._last.items() if ts < cutoff]
+        for key in expired:
+            del self._last[key]
+        if expired:
+            self._dirty = True
+        return len(expired)
+
+    def load(self) -> int:
+        if not self.path:
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.warning("Ignoring unreadable alert state %s: %s", self.path, e)
+            return 0
+        for row in rows if isinstance(rows, list) else []:
+            try:
+                club_id, alert_type, ts = row
+                self._last[(int(club_id), str(alert_type))] = float(ts)
+            except (TypeError, ValueError):
+                continue
+        self.evict()
+        logger.info("Restored %d alert cooldowns", len(self._last))
+        return len(self._last)
+
+    def save(self, force: bool = False) -> None:
+        """Write the snapshot if anything changed since the last save."""
+        if not self.path or not (self._dirty or force):
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump([[c, t, ts] for (c, t), ts in self._last.items()], f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except Exception as e:
+            logger.warning("Could not save alert state to %s: %s", self.path, e)
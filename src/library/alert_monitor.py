@@ -1,144 +1,318 @@
 import asyncio
+import html
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
 
+import numpy as np
 from telegram import Bot
 from telegram.error import TelegramError
 
-from .get_all_club_limits import get_all_club_limits
-from ..utils.roles import user_roles
+from src.config import ALERT_DIGEST_MODE, ALERT_LOSS_TIERS, ALERT_STATE_FILE, ALERT_WIN_TIERS
+from .alert_cooldowns import AlertCooldownStore
+from .alert_rules import AlertRule, AlertRuleSet
+from .club_columns import ClubColumns, ColumnChangeTracker
+from .club_snapshot import club_snapshots
+from .history_store import club_history
+from ..utils.rate_limit import PRIORITY_ALERT
+from ..utils.roles import get_users_with_role
 
 logger = logging.getLogger(__name__)
 
-LOSS_LIMIT_WARNING_PERCENT = 90.0
-WIN_LIMIT_WARNING_PERCENT = 90.0
 PNL_NEGATIVE_THRESHOLD = -1000.0
 CHECK_INTERVAL_MINUTES = 1
 ALERT_COOLDOWN_MINUTES = 5
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+DIGEST_SEPARATOR = "\n\n"
 
-last_alert_times: Dict[str, datetime] = {}
 alert_cooldown = timedelta(minutes=ALERT_COOLDOWN_MINUTES)
+# Cooldowns keyed by (club_id, alert_type); restored at boot, saved every sweep
+alert_cooldowns = AlertCooldownStore(alert_cooldown.total_seconds(), path=ALERT_STATE_FILE)
 
-def parse_numeric_value(value_str: str) -> float:
-    if not value_str or value_str.strip() == "":
-        return 0.0
-    try:
-        return float(str(value_str).replace(",", "").strip())
-    except (ValueError, TypeError):
-        return 0.0
+# Built-in rule for every club; rows in the alert rules table override it per
+# region or club. Usage tiers are percent of the limit and alert types are
+# named after them: "loss_90", "win_100", ...
+DEFAULT_ALERT_RULE = AlertRule(
+    loss_tiers=ALERT_LOSS_TIERS,
+    win_tiers=ALERT_WIN_TIERS,
+    pnl_threshold=PNL_NEGATIVE_THRESHOLD,
+    cooldown=alert_cooldown.total_seconds(),
+)
+_rules = AlertRuleSet.from_default(DEFAULT_ALERT_RULE)
+
+# Alert sends in flight; the sweep queues them and moves on
+_pending_sends: Set[asyncio.Task] = set()
+
+# Change detection: rule inputs (f4-f7) as of the last evaluated sweep, and
+# when a club whose alert was held back by cooldown must be re-evaluated
+_tracker = ColumnChangeTracker()
+_recheck_at: Dict[int, datetime] = {}
+last_sweep_stats: Dict[str, int] = {"clubs": 0, "evaluated": 0, "skipped": 0, "alerts": 0, "messages": 0}
+
+class AlertHit(NamedTuple):
+    row: int
+    alert_type: str
+    value: float  # usage percent for loss/win tiers, total P&L for pnl
+    cooldown: float  # seconds, from the club's rule
 
-def should_send_alert(club_id: int, alert_type: str) -> bool:
-    key = f"{club_id}_{alert_type}"
-    last_alert = last_alert_times.get(key)
-    if not last_alert:
-        return True
-    return datetime.now() - last_alert > alert_cooldown
+def set_alert_rules(rule_rows: List[Dict[str, Any]], region_rows: List[Dict[str, Any]]) -> AlertRuleSet:
+    """Compile DB rule rows and swap them in for the next sweep."""
+    global _rules
+    _rules = AlertRuleSet.compile(DEFAULT_ALERT_RULE, rule_rows, region_rows)
+    alert_cooldowns.ttl = max(alert_cooldowns.cooldown, _rules.max_cooldown)
+    # Thresholds changed even where values did not, so re-evaluate every club
+    _tracker.reset()
+    return _rules
+
+def should_send_alert(club_id: int, alert_type: str, cooldown: Optional[float] = None) -> bool:
+    return alert_cooldowns.should_send(club_id, alert_type, cooldown)
 
 def update_alert_time(club_id: int, alert_type: str):
-    key = f"{club_id}_{alert_type}"
-    last_alert_times[key] = datetime.now()
+    alert_cooldowns.record(club_id, alert_type)
+
+def next_alert_time(club_id: int, alert_type: str, cooldown: Optional[float] = None) -> datetime:
+    """Earliest time this (club, alert type) may fire again."""
+    allowed = alert_cooldowns.next_allowed(club_id, alert_type, cooldown)
+    return max(datetime.now(), datetime.fromtimestamp(allowed)) if allowed else datetime.now()
+
+def limit_usage(cols: ClubColumns, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percent of the loss and win limits used, from the snapshot alone:
+    a club's total P&L (ring + tournament) counts against the loss limit
+    when negative and against the win limit when positive. 0 where the
+    limit is not set (0 or negative: such clubs are not monitored).
+    """
+    total_pnl = cols.total_pnl[rows]
+    loss_limit = cols.loss_limit[rows]
+    win_limit = cols.win_limit[rows]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        loss_pct = np.where(loss_limit > 0, np.maximum(-total_pnl, 0) / loss_limit * 100, 0.0)
+        win_pct = np.where(win_limit > 0, np.maximum(total_pnl, 0) / win_limit * 100, 0.0)
+    return loss_pct, win_pct
+
+def _tier_label(tier: float) -> str:
+    return f"{tier:g}"
+
+def evaluate_rules(cols: ClubColumns, rows: np.ndarray) -> List[AlertHit]:
+    """
+    Evaluate every club's rule over `rows` at once. Each row is mapped to
+    its compiled rule index, and tiers/thresholds are gathered from the
+    rule arrays, so per-club rules cost no more than global ones.
+
+    Returns the firing alerts ordered by row (loss, win, pnl within a row).
+    Only the highest loss/win tier reached fires, so a club crossing 90%
+    gets "loss_90" and not also "loss_75".
+    """
+    rule = _rules.rule_index(cols.public_id[rows])
+    enabled = _rules.enabled[rule]
+    loss_limit = cols.loss_limit[rows]
+    win_limit = cols.win_limit[rows]
+    total_pnl = cols.total_pnl[rows]
+    loss_pct, win_pct = limit_usage(cols, rows)
+
+    # Tiers are ascending and padded with +inf, so the number reached - 1
+    # is the index of the highest one
+    loss_tier = (loss_pct[:, None] >= _rules.loss_tiers[rule]).sum(axis=1) - 1
+    win_tier = (win_pct[:, None] >= _rules.win_tiers[rule]).sum(axis=1) - 1
+    loss_tier = np.where(enabled & (loss_limit > 0), loss_tier, -1)
+    win_tier = np.where(enabled & (win_limit > 0), win_tier, -1)
+
+    # Clubs with neither limit set are not monitored at all
+    has_limit = (loss_limit > 0) | (win_limit > 0)
+    pnl_hit = enabled & has_limit & (total_pnl <= _rules.pnl_threshold[rule])
+    cooldown = _rules.cooldown[rule]
+
+    hits: List[AlertHit] = []
+    for name, tier_idx, pct, tiers in (
+        ("loss", loss_tier, loss_pct, _rules.loss_tiers),
+        ("win", win_tier, win_pct, _rules.win_tiers),
+    ):
+        for r in np.flatnonzero(tier_idx >= 0).tolist():
+            tier = tiers[rule[r], tier_idx[r]]
+            hits.append(AlertHit(int(rows[r]), f"{name}_{_tier_label(tier)}", float(pct[r]), float(cooldown[r])))
+    for r in np.flatnonzero(pnl_hit).tolist():
+        hits.append(AlertHit(int(rows[r]), "pnl", float(total_pnl[r]), float(cooldown[r])))
+    hits.sort(key=lambda hit: hit.row)
+    return hits
+
+def format_alert(cols: ClubColumns, row: int, alert_type: str, value: float) -> str:
+    club_name = html.escape(str(cols.clubs[row].f2))
+    total_pnl = cols.ring_pnl[row] + cols.tourney_pnl[row]
+    if alert_type.startswith(("loss_", "win_")):
+        kind, tier = alert_type.split("_", 1)
+        label = "Loss" if kind == "loss" else "Win"
+        limit = cols.loss_limit[row] if kind == "loss" else cols.win_limit[row]
+        headline = f"{label} Limit Reached" if float(tier) >= 100 else f"{label} Limit {tier}% Warning"
+        return f"🚨 <b>{headline}</b>\n\n" \
+               f"🏛️ <b>Club:</b> {club_name}\n" \
+               f"📊 <b>{label} Limit:</b> ${limit:,.2f}\n" \
+               f"💰 <b>Total P&amp;L:</b> ${total_pnl:,.2f}\n" \
+               f"📈 <b>Usage:</b> {value:.1f}%"
+    return f"🚨 <b>P&amp;L Alert</b>\n\n" \
+           f"🏛️ <b>Club:</b> {club_name}\n" \
+           f"💰 <b>Total P&amp;L:</b> ${value:,.2f}\n" \
+           f"🎰 <b>Ring Game P&amp;L:</b> ${cols.ring_pnl[row]:,.2f}\n" \
+           f"🏆 <b>Tournament P&amp;L:</b> ${cols.tourney_pnl[row]:,.2f}"
 
 def get_alert_recipients(club_id: int, application) -> List[int]:
-    chat_club_map = application.bot_data.get("chat_club_map", {})
-    for chat_id, mapped_club_id in chat_club_map.items():
-        if mapped_club_id == club_id:
-            return [chat_id]
-    
-    recipients = []
-    for user_id, roles in user_roles.items():
-        if "admin" in roles or "manager" in roles:
-            recipients.append(user_id)
+    """
+    Chats mapped to this club (display ID, as stored in chat_to_club) via
+    the club_id -> [chat_ids] index; Union Heads if no chat is mapped.
+    """
+    club_chat_index = application.bot_data.get("club_chat_index", {})
+    chats = club_chat_index.get(club_id)
+    if chats:
+        return list(chats)
     
-    return recipients
+    return get_users_with_role("Union Head")
 
-async def send_alert(bot: Bot, message: str, chat_id: int, club_id: int):
+async def send_alert(bot: Bot, message: str, chat_id: int, label: str):
     try:
-        await bot.send_message(chat_id=chat_id, text=message, parse_mode="HTML")
-        update_alert_time(club_id, "general")
-        logger.info(f"Alert sent to chat {chat_id} for club {club_id}")
+        # Alerts yield to interactive replies in the outbound queue
+        await bot.send_message(
+            chat_id=chat_id, text=message, parse_mode="HTML", rate_limit_args=PRIORITY_ALERT
+        )
+        logger.info(f"Alert sent to chat {chat_id} ({label})")
     except TelegramError as e:
         logger.error(f"Failed to send alert to chat {chat_id}: {e}")
 
+def dispatch_alert(bot: Bot, message: str, chat_id: int, label: str):
+    """Queue a send without waiting for Telegram; the sweep keeps going."""
+    task = asyncio.create_task(send_alert(bot, message, chat_id, label))
+    _pending_sends.add(task)
+    task.add_done_callback(_pending_sends.discard)
+
+def queue_alert(outbox: Dict[int, List[str]], recipients: List[int], message: str, club_id: int, alert_type: str) -> int:
+    """
+    Add an alert to every recipient's outbox for this sweep. The cooldown
+    starts when the alert is queued, so a slow queue cannot make the next
+    sweep queue it twice.
+    """
+    update_alert_time(club_id, alert_type)
+    for chat_id in recipients:
+        outbox.setdefault(chat_id, []).append(message)
+    return len(recipients)
+
+def build_digest(alerts: List[str], limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Join a chat's alerts into as few messages as fit under `limit`.
+    Alerts are never split across messages; one that is too long on its
+    own is truncated.
+    """
+    header = f"📋 <b>Alert digest</b> ({len(alerts)} alerts)" if len(alerts) > 1 else ""
+    # Leave room for the header so the first message always carries an alert
+    max_alert = limit - len(header) - len(DIGEST_SEPARATOR)
+    messages: List[str] = []
+    current = header
+    for alert in alerts:
+        if len(alert) > max_alert:
+            alert = alert[: max_alert - 1] + "…"
+        candidate = f"{current}{DIGEST_SEPARATOR}{alert}" if current else alert
+        if len(candidate) > limit:
+            messages.append(current)
+            candidate = alert
+        current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+def flush_alerts(bot: Bot, outbox: Dict[int, List[str]]) -> int:
+    """Send this sweep's alerts: one digest per chat, or one message per alert."""
+    sent = 0
+    for chat_id, alerts in outbox.items():
+        if ALERT_DIGEST_MODE:
+            parts = build_digest(alerts)
+            for i, text in enumerate(parts, 1):
+                dispatch_alert(bot, text, chat_id, f"digest {i}/{len(parts)}, {len(alerts)} alerts")
+            sent += len(parts)
+        else:
+            for text in alerts:
+                dispatch_alert(bot, text, chat_id, "1 alert")
+            sent += len(alerts)
+    return sent
+
 async def check_club_limits(bot: Bot, application):
     try:
-        sid = application.bot_data.get("sid")
-        if not sid:
+        session = application.bot_data.get("session")
+        if not session or not session.sid:
             logger.warning("No SID available for limit checking")
             return
 
-        club_data = await get_all_club_limits(sid)
-        if not club_data or not club_data.DATA:
+        # Each sweep refreshes the shared snapshot that /cl and mappings read
+        snapshot = await club_snapshots.refresh(session)
+        if not snapshot or not snapshot.clubs:
             logger.warning("No club data available")
             return
 
+        await club_history.record_snapshot(snapshot)
+
+        # chat_id -> alert texts for this sweep, sent together after the loop
+        outbox: Dict[int, List[str]] = {}
         total_alerts_sent = 0
+        now = datetime.now()
 
-        for club in club_data.DATA:
-            try:
-                club_id = int(club.cno)
-                win_limit = parse_numeric_value(club.f7)  # f7 is win limit
-                loss_limit = parse_numeric_value(club.f6)  # f6 is loss limit
-                win_usage = 0  # Usage not available in this API
-                loss_usage = 0  # Usage not available in this API
-
-                if win_limit <= 0 and loss_limit <= 0:
-                    continue
-
-                if loss_limit > 0:
-                    loss_percentage = (loss_usage / loss_limit) * 100
-                    if loss_percentage >= LOSS_LIMIT_WARNING_PERCENT and should_send_alert(club_id, "loss"):
-                        message = f"🚨 *Loss Limit Alert*\n\n" \
-                                f"🏛️ *Club:* {club.f2}\n" \
-                                f"📊 *Loss Limit:* ${loss_limit:,.2f}\n" \
-                                f"📈 *Usage:* {loss_percentage:.1f}%"
-                       
-                        recipients = get_alert_recipients(club_id, application)
-                        for chat_id in recipients:
-                            await send_alert(bot, message, chat_id, club_id)
-                            total_alerts_sent += 1
-
-                if win_limit > 0:
-                    win_percentage = (win_usage / win_limit) * 100
-                    if win_percentage >= WIN_LIMIT_WARNING_PERCENT and should_send_alert(club_id, "win"):
-                        message = f"🚨 *Win Limit Alert*\n\n" \
-                                f"🏛️ *Club:* {club.f2}\n" \
-                                f"📊 *Win Limit:* ${win_limit:,.2f}\n" \
-                                f"📈 *Usage:* {win_percentage:.1f}%"
-                       
-                        recipients = get_alert_recipients(club_id, application)
-                        for chat_id in recipients:
-                            await send_alert(bot, message, chat_id, club_id)
-                            total_alerts_sent += 1
-
-                ring_pnl = parse_numeric_value(club.f4)  # f4 is ring P&L
-                tournament_pnl = parse_numeric_value(club.f5)  # f5 is tournament P&L
-                total_pnl = ring_pnl + tournament_pnl
-
-                if total_pnl <= PNL_NEGATIVE_THRESHOLD and should_send_alert(club_id, "pnl"):
-                    message = f"🚨 *P&L Alert*\n\n" \
-                            f"🏛️ *Club:* {club.f2}\n" \
-                            f"💰 *Total P&L:* ${total_pnl:,.2f}\n" \
-                            f"🎰 *Ring Game P&L:* ${ring_pnl:,.2f}\n" \
-                            f"🏆 *Tournament P&L:* ${tournament_pnl:,.2f}"
-                   
-                    recipients = get_alert_recipients(club_id, application)
-                    for chat_id in recipients:
-                        await send_alert(bot, message, chat_id, club_id)
-                        total_alerts_sent += 1
+        cols = ClubColumns.from_clubs(snapshot.clubs)
+        due = [club_id for club_id, at in _recheck_at.items() if at <= now]
+        rows = _tracker.changed(cols, also=due)
+        evaluated = len(rows)
 
-            except Exception as e:
-                logger.error(f"Error processing club {club.cno}: {e}")
+        firing: Dict[int, List[AlertHit]] = {}
+        failed_rows: List[int] = []
+        for hit in evaluate_rules(cols, rows):
+            club_id = int(cols.cno[hit.row])
+            firing.setdefault(club_id, []).append(hit)
+            if not should_send_alert(club_id, hit.alert_type, hit.cooldown):
                 continue
+            try:
+                message = format_alert(cols, hit.row, hit.alert_type, hit.value)
+                # chat_to_club stores the public (display) club ID
+                recipients = get_alert_recipients(int(cols.public_id[hit.row]), application)
+                total_alerts_sent += queue_alert(outbox, recipients, message, club_id, hit.alert_type)
+            except Exception as e:
+                logger.error(f"Error queueing {hit.alert_type} alert for club {club_id}: {e}")
+                failed_rows.append(hit.row)
+
+        messages_sent = flush_alerts(bot, outbox)
+
+        # While any rule still matches, come back when its cooldown expires
+        # so the repeat alert is not lost, even if nothing changes
+        for club_id in cols.cno[rows].tolist():
+            _recheck_at.pop(club_id, None)
+        for club_id, hits in firing.items():
+            _recheck_at[club_id] = min(next_alert_time(club_id, h.alert_type, h.cooldown) for h in hits)
+        # Clubs whose alert failed to queue stay "changed" and are retried next sweep
+        _tracker.update(cols, skip=failed_rows)
+
+        # Forget clubs that left the union
+        present = set(cols.cno.tolist())
+        for club_id in [c for c in _recheck_at if c not in present]:
+            _recheck_at.pop(club_id, None)
+
+        last_sweep_stats.update(
+            clubs=len(snapshot.clubs),
+            evaluated=evaluated,
+            skipped=len(snapshot.clubs) - evaluated,
+            alerts=total_alerts_sent,
+            messages=messages_sent,
+        )
+        alert_cooldowns.evict()
+        alert_cooldowns.save()
+
+        logger.debug(
+            "Alert sweep: %d clubs, %d evaluated, %d unchanged",
+            len(snapshot.clubs), evaluated, len(snapshot.clubs) - evaluated,
+        )
 
         if total_alerts_sent > 0:
-            logger.info(f"Sent {total_alerts_sent} alerts")
+            logger.info(f"Queued {total_alerts_sent} alerts in {messages_sent} messages")
 
     except Exception as e:
         logger.error(f"Error in limit checking: {e}")
 
 async def start_alert_monitoring(bot, application):
     logger.info("Alert monitoring started")
+    alert_cooldowns.load()
     
     while True:
         try:
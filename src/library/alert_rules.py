@@ -0,0 +1,163 @@
+# src/library/alert_rules.py
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Thresholds for one club. Tiers are percent of the limit, ascending."""
+    loss_tiers: Tuple[float, ...]
+    win_tiers: Tuple[float, ...]
+    pnl_threshold: float
+    cooldown: float  # seconds
+    enabled: bool = True
+
+    def merged(self, overrides: Dict[str, Any]) -> "AlertRule":
+        return replace(self, **overrides) if overrides else self
+
+
+def parse_tiers(value: Any) -> Optional[Tuple[float, ...]]:
+    """'75,90,100' -> (75.0, 90.0, 100.0); NULL -> None (inherit); '' -> () (off)."""
+    if value is None:
+        return None
+    tiers = []
+    for part in str(value).replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            tiers.append(float(part))
+        except ValueError:
+            logger.warning(f"Ignoring invalid alert tier {part!r}")
+    return tuple(sorted(set(tiers)))
+
+
+def parse_rule_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields a DB rule row sets; NULL columns are left to inherit."""
+    overrides: Dict[str, Any] = {}
+    for field in ("loss_tiers", "win_tiers"):
+        tiers = parse_tiers(row.get(field))
+        if tiers is not None:
+            overrides[field] = tiers
+    if row.get("pnl_threshold") is not None:
+        overrides["pnl_threshold"] = float(row["pnl_threshold"])
+    if row.get("cooldown_minutes") is not None:
+        overrides["cooldown"] = float(row["cooldown_minutes"]) * 60
+    if row.get("enabled") is not None:
+        overrides["enabled"] = bool(int(row["enabled"]))
+    return overrides
+
+
+def _pad(tiers: Iterable[Tuple[float, ...]]) -> np.ndarray:
+    """Rows of tiers padded with +inf (never reached) to a rectangle."""
+    tiers = list(tiers)
+    width = max((len(t) for t in tiers), default=0) or 1
+    matrix = np.full((len(tiers), width), np.inf)
+    for i, t in enumerate(tiers):
+        matrix[i, : len(t)] = t
+    return matrix
+
+
+class AlertRuleSet:
+    """
+    Alert rules compiled for the sweep.
+
+    Every distinct effective rule gets an index (0 = default) and each rule
+    field becomes an array over those indexes. Clubs with their own
+    effective rule (club or region override) are kept as a sorted array of
+    display IDs, so `rule_index()` maps a whole column of clubs to rules
+    with one searchsorted and no per-club lookups.
+    """
+
+    def __init__(self, rules: List[AlertRule], club_ids: Dict[int, int]):
+        self.rules = rules
+        self.club_ids = np.array(sorted(club_ids), dtype=np.int64)
+        self.club_rule = np.array([club_ids[c] for c in self.club_ids.tolist()], dtype=np.int64)
+        self.loss_tiers = _pad(r.loss_tiers for r in rules)
+        self.win_tiers = _pad(r.win_tiers for r in rules)
+        self.pnl_threshold = np.array([r.pnl_threshold for r in rules], dtype=np.float64)
+        self.cooldown = np.array([r.cooldown for r in rules], dtype=np.float64)
+        self.enabled = np.array([r.enabled for r in rules], dtype=bool)
+
+    @property
+    def default(self) -> AlertRule:
+        return self.rules[0]
+
+    @property
+    def max_cooldown(self) -> float:
+        return float(self.cooldown.max())
+
+    @classmethod
+    def from_default(cls, default: AlertRule) -> "AlertRuleSet":
+        return cls([default], {})
+
+    @classmethod
+    def compile(
+        cls,
+        default: AlertRule,
+        rule_rows: List[Dict[str, Any]],
+        region_rows: List[Dict[str, Any]],
+    ) -> "AlertRuleSet":
+        """
+        Resolve rule rows (scope 'default' | 'region' | 'club') into one
+        effective rule per club. Precedence: club > region > default >
+        built-in, field by field, so a club row can override only its
+        cooldown and inherit the rest.
+        """
+        default_overrides: Dict[str, Any] = {}
+        region_overrides: Dict[str, Dict[str, Any]] = {}
+        club_overrides: Dict[int, Dict[str, Any]] = {}
+        for row in rule_rows:
+            scope = str(row.get("scope") or "").strip().lower()
+            scope_id = str(row.get("scope_id") or "").strip()
+            try:
+                overrides = parse_rule_row(row)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Skipping invalid alert rule {row}: {e}")
+                continue
+            if scope == "default":
+                default_overrides.update(overrides)
+            elif scope == "region" and scope_id:
+                region_overrides.setdefault(scope_id.lower(), {}).update(overrides)
+            elif scope == "club" and scope_id.isdigit():
+                club_overrides.setdefault(int(scope_id), {}).update(overrides)
+            else:
+                logger.warning(f"Skipping alert rule with unknown scope: {row}")
+
+        club_region: Dict[int, str] = {}
+        for row in region_rows:
+            club_id = str(row.get("club_id") or "").strip()
+            region = str(row.get("region") or "").strip().lower()
+            if club_id.isdigit() and region:
+                club_region[int(club_id)] = region
+
+        base = default.merged(default_overrides)
+        rules = [base]
+        index = {base: 0}
+        club_ids: Dict[int, int] = {}
+        for club_id in set(club_overrides) | set(club_region):
+            rule = base.merged(region_overrides.get(club_region.get(club_id), {}))
+            rule = rule.merged(club_overrides.get(club_id, {}))
+            if rule == base:
+                continue
+            if rule not in index:
+                index[rule] = len(rules)
+                rules.append(rule)
+            club_ids[club_id] = index[rule]
+
+        logger.info(f"Compiled {len(rules)} alert rules covering {len(club_ids)} clubs with overrides")
+        return cls(rules, club_ids)
+
+    def rule_index(self, public_ids: np.ndarray) -> np.ndarray:
+        """Rule index for each display club ID (0 where the default applies)."""
+        if not self.club_ids.size:
+            return np.zeros(len(public_ids), dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.club_ids, public_ids), self.club_ids.size - 1)
+        return np.where(self.club_ids[pos] == public_ids, self.club_rule[pos], 0)
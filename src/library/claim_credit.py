@@ -5,7 +5,7 @@ import re
 from dataclasses import dataclass
 from typing import Any, List, Optional
 
-import requests
+from .http_client import SessionExpiredError, post_form
 
 
 @dataclass
@@ -33,27 +33,13 @@ async def claim_credit(club_id: str, connect_sid: str, amount: int) -> Optional[
         ClaimCreditResult on success, or None on request error.
     """
     try:
-        url = "https://union.clubgg.com/counteru"
-        headers = {
-            "Accept": "*/*",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Origin": "https://union.clubgg.com",
-            "Referer": "https://union.clubgg.com/counteru",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
-            ),
-            "Cookie": f"connect.sid={connect_sid}",
-        }
-
         payload = {
             "iam": "claimback",
             "clubstr": f"{club_id},{amount}",
         }
 
         # keep timeouts sane to avoid hanging forever
-        import asyncio
-        resp = await asyncio.to_thread(requests.post, url, headers=headers, data=payload, timeout=30)
+        resp = await post_form("/counteru", payload, connect_sid, timeout=30)
         # don't raise for status; the API sometimes returns 200 with error JSON
         data = resp.json() if resp.headers.get("content-type", "").startswith("application/json") else {}
 
@@ -78,6 +64,8 @@ async def claim_credit(club_id: str, connect_sid: str, amount: int) -> Optional[
             raw=data,
         )
 
+    except SessionExpiredError:
+        raise
     except Exception as e:
         # mirror TS behavior: log and return None
         print("Claim credit request error:", e)
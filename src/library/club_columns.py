@@ -0,0 +1,104 @@
+# src/library/club_columns.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .get_all_club_limits import ClubLimitData, _parse_num
+
+
+@dataclass
+class ClubColumns:
+    """
+    One sweep as numeric column arrays (row i = clubs[i]), parsed once so
+    rules can be evaluated as vectorized masks.
+    """
+    clubs: List[ClubLimitData]
+    cno: np.ndarray          # backend id (int64)
+    public_id: np.ndarray    # display id f1, falls back to cno (int64)
+    ring_pnl: np.ndarray     # f4
+    tourney_pnl: np.ndarray  # f5
+    loss_limit: np.ndarray   # f6
+    win_limit: np.ndarray    # f7
+
+    @classmethod
+    def from_clubs(cls, clubs: Sequence[ClubLimitData]) -> "ClubColumns":
+        clubs = list(clubs)
+        cno = np.fromiter((int(c.cno) for c in clubs), dtype=np.int64, count=len(clubs))
+        public_id = np.fromiter(
+            (int(c.f1) if str(c.f1).strip().isdigit() else int(c.cno) for c in clubs),
+            dtype=np.int64,
+            count=len(clubs),
+        )
+
+        def column(attr: str) -> np.ndarray:
+            return np.fromiter((_parse_num(getattr(c, attr)) for c in clubs), dtype=np.float64, count=len(clubs))
+
+        return cls(
+            clubs=clubs,
+            cno=cno,
+            public_id=public_id,
+            ring_pnl=column("f4"),
+            tourney_pnl=column("f5"),
+            loss_limit=column("f6"),
+            win_limit=column("f7"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.clubs)
+
+    @property
+    def total_pnl(self) -> np.ndarray:
+        return self.ring_pnl + self.tourney_pnl
+
+    @property
+    def values(self) -> np.ndarray:
+        """(n, 4) matrix of the fields the alert rules read, for change detection."""
+        return np.column_stack((self.ring_pnl, self.tourney_pnl, self.loss_limit, self.win_limit))
+
+
+class ColumnChangeTracker:
+    """
+    Remembers the rule inputs of the last evaluated sweep (sorted by cno) and
+    reports which rows of a new sweep differ, without a per-club Python loop.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def changed(self, cols: ClubColumns, also: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Row indices whose values changed or whose club is new, plus rows for
+        the backend ids in `also` (e.g. clubs due a cooldown re-check).
+        """
+        values = cols.values
+        if self._cno.size:
+            pos = np.minimum(np.searchsorted(self._cno, cols.cno), self._cno.size - 1)
+            known = self._cno[pos] == cols.cno
+            same = known & np.all(self._values[pos] == values, axis=1)
+        else:
+            same = np.zeros(len(cols), dtype=bool)
+        mask = ~same
+        if also:
+            mask |= np.isin(cols.cno, np.fromiter(also, dtype=np.int64))
+        return np.flatnonzero(mask)
+
+    def reset(self) -> None:
+        """Forget the last sweep so every club is evaluated next time."""
+        self._cno = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, 4), dtype=np.float64)
+
+    def update(self, cols: ClubColumns, skip: Optional[Sequence[int]] = None) -> None:
+        """
+        Remember this sweep. Rows in `skip` (e.g. alerts that failed to
+        queue) are left out, so they count as new and are evaluated again.
+        """
+        keep = np.ones(len(cols), dtype=bool)
+        if skip:
+            keep[np.fromiter(skip, dtype=np.int64)] = False
+        cno, values = cols.cno[keep], cols.values[keep]
+        order = np.argsort(cno, kind="stable")
+        self._cno = cno[order]
+        self._values = values[order]
@@ -0,0 +1,79 @@
+# src/library/club_limit_cache.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import replace
+from typing import Dict, Optional, Tuple
+
+from src.config import CLUB_LIMIT_CACHE_TTL_SECONDS
+from .get_club_limit import ClubLimitResponse, get_club_limit
+
+logger = logging.getLogger(__name__)
+
+
+class ClubLimitCache:
+    """
+    Read-through cache of get_club_limit() keyed by backend cno. `get()`
+    serves an entry while younger than the TTL and otherwise fetches;
+    concurrent misses for one club share one request. Writes made through
+    the bot update entries in place (`update()`), failed or uncertain
+    writes drop them (`invalidate()`).
+    """
+
+    def __init__(self, ttl: float = CLUB_LIMIT_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        # cno -> (time.monotonic() when stored, response)
+        self._entries: Dict[str, Tuple[float, ClubLimitResponse]] = {}
+        self._fetches: Dict[str, asyncio.Task] = {}
+        # cno -> bumped on every update/invalidate, so a read that started
+        # before a write cannot store the pre-write limits afterwards
+        self._versions: Dict[str, int] = {}
+
+    def peek(self, cno, max_age: Optional[float] = None) -> Optional[ClubLimitResponse]:
+        limit = self.ttl if max_age is None else max_age
+        entry = self._entries.get(str(cno))
+        if entry and time.monotonic() - entry[0] < limit:
+            return entry[1]
+        return None
+
+    async def get(self, session, cno, max_age: Optional[float] = None) -> Optional[ClubLimitResponse]:
+        cno = str(cno)
+        cached = self.peek(cno, max_age)
+        if cached is not None:
+            return cached
+        task = self._fetches.get(cno)
+        if task is None:
+            task = self._fetches[cno] = asyncio.create_task(self._fetch(session, cno))
+            task.add_done_callback(lambda t: self._fetches.get(cno) is t and self._fetches.pop(cno))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, session, cno: str) -> Optional[ClubLimitResponse]:
+        version = self._versions.get(cno, 0)
+        resp = await session.call(get_club_limit, cno)
+        if resp and resp.INFO and self._versions.get(cno, 0) == version:
+            self._entries[cno] = (time.monotonic(), resp)
+        return resp
+
+    def update(self, cno, win: int, loss: int) -> None:
+        """Apply a successful set_limit to the cached entry (read-your-writes)."""
+        self._bump(cno)
+        entry = self._entries.get(str(cno))
+        if entry is None:
+            return  # nothing cached; the next read fetches it
+        info = replace(entry[1].INFO, win=str(win), loss=str(loss))
+        self._entries[str(cno)] = (time.monotonic(), ClubLimitResponse(INFO=info))
+
+    def invalidate(self, cno) -> None:
+        self._bump(cno)
+        if self._entries.pop(str(cno), None) is not None:
+            logger.debug("Club limit cache entry dropped for %s", cno)
+
+    def _bump(self, cno) -> None:
+        self._versions[str(cno)] = self._versions.get(str(cno), 0) + 1
+        # Later readers must not join a fetch that started before this write
+        self._fetches.pop(str(cno), None)
+
+
+club_limits = ClubLimitCache()
@@ -0,0 +1,122 @@
+# src/library/club_snapshot.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.config import CLUB_SNAPSHOT_TTL_SECONDS
+from .get_all_club_limits import AllClubLimitsResponse, ClubLimitData, _parse_num, get_all_club_limits
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClubSnapshot:
+    """One full paginated sweep of /clublimit, indexed for O(1) lookups."""
+    clubs: List[ClubLimitData]
+    fetched_at: float  # time.monotonic()
+    taken_at: float = field(default_factory=time.time)  # wall clock, for history
+    by_cno: Dict[int, ClubLimitData] = field(default_factory=dict)
+    by_public_id: Dict[int, ClubLimitData] = field(default_factory=dict)
+    # False if some pages failed and no earlier snapshot could fill them in
+    complete: bool = True
+
+    @classmethod
+    def from_response(cls, resp: AllClubLimitsResponse, previous: Optional["ClubSnapshot"] = None) -> "ClubSnapshot":
+        """
+        Index a sweep. If pages were missing, clubs from `previous` that the
+        sweep did not return are carried over (with their earlier values) so
+        they stay mapped until the next full sweep.
+        """
+        clubs = list(resp.DATA)
+        complete = resp.complete
+        if not complete and previous is not None:
+            seen = {int(club.cno) for club in clubs}
+            clubs += [club for club in previous.clubs if int(club.cno) not in seen]
+            complete = previous.complete
+        snap = cls(clubs=clubs, fetched_at=time.monotonic(), complete=complete)
+        for club in snap.clubs:
+            snap.by_cno[int(club.cno)] = club
+            public_id = str(club.f1).strip()
+            if public_id.isdigit():
+                snap.by_public_id[int(public_id)] = club
+        return snap
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def club_id_map(self) -> Dict[int, int]:
+        """display (public f1) id -> backend cno"""
+        return {public_id: int(club.cno) for public_id, club in self.by_public_id.items()}
+
+    def pnl_for(self, backend_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        P&L of one club by backend id:
+            {"publicId": str, "ringPnl": float, "tourneyPnl": float} or None
+        """
+        try:
+            club = self.by_cno.get(int(backend_id))
+        except (TypeError, ValueError):
+            return None
+        if not club:
+            return None
+        return {
+            "publicId": str(club.f1),
+            "ringPnl": _parse_num(club.f4),     # Ring Game P&L
+            "tourneyPnl": _parse_num(club.f5),  # Tournament P&L
+        }
+
+
+class ClubSnapshotCache:
+    """
+    Holds the latest ClubSnapshot. `get()` serves it while younger than the
+    TTL and otherwise refreshes; concurrent refreshes share one sweep.
+    """
+
+    def __init__(self, ttl: float = CLUB_SNAPSHOT_TTL_SECONDS):
+        self.ttl = ttl
+        self._snapshot: Optional[ClubSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[ClubSnapshot]:
+        return self._snapshot
+
+    def is_fresh(self, max_age: Optional[float] = None) -> bool:
+        limit = self.ttl if max_age is None else max_age
+        return self._snapshot is not None and self._snapshot.age < limit
+
+    async def get(self, session, max_age: Optional[float] = None) -> Optional[ClubSnapshot]:
+        if self.is_fresh(max_age):
+            return self._snapshot
+        return await self.refresh(session)
+
+    async def refresh(self, session) -> Optional[ClubSnapshot]:
+        """
+        Run one paginated sweep through the session manager. On failure the
+        previous snapshot (if any) is kept and returned.
+        """
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._sweep(session))
+        return await asyncio.shield(self._refresh_task)
+
+    async def _sweep(self, session) -> Optional[ClubSnapshot]:
+        resp = await session.call(get_all_club_limits)
+        if not resp or not resp.DATA:
+            logger.warning("Club snapshot refresh returned no data; keeping previous snapshot")
+            return self._snapshot
+        if not resp.complete:
+            logger.warning(
+                "Club snapshot sweep missed pages %s; keeping those clubs from the previous snapshot",
+                resp.missing_pages,
+            )
+        self._snapshot = ClubSnapshot.from_response(resp, previous=self._snapshot)
+        logger.debug("Club snapshot refreshed: %d clubs", len(self._snapshot.clubs))
+        return self._snapshot
+
+
+club_snapshots = ClubSnapshotCache()
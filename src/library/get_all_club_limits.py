@@ -1,9 +1,13 @@
 # src/library/get_all_club_limits.py
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
-import requests
+
+from .http_client import SessionExpiredError, post_form
+
+MAX_PAGE_CONCURRENCY = 4
 
 
 @dataclass
@@ -30,6 +34,11 @@ class AllClubLimitsResponse:
     COMM: Dict[str, Any]
     PAGE: Dict[str, Any]
     DATA: List[ClubLimitData]
+    missing_pages: List[int] = field(default_factory=list)  # pages that failed to load
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing_pages
 
 
 def _parse_num(n: Optional[str]) -> float:
@@ -69,64 +78,106 @@ def _safe_make_club_data(obj: Dict[str, Any]) -> Optional[ClubLimitData]:
         return None
 
 
-async def get_all_club_limits(connect_sid: str) -> Optional[AllClubLimitsResponse]:
+async def _fetch_page(connect_sid: str, page: int) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one /clublimit list page. Returns the JSON dict or None.
+    """
+    payload = {
+        "iam": "list",
+        "clubnm": "",
+        "cur_page": str(page),
+        "column": "ring",
+        "asc": "2",
+    }
+
+    resp = await post_form("/clublimit", payload, connect_sid, timeout=30)
+
+    if resp.status_code != 200:
+        print(f"HTTP error: {resp.status_code} (page {page})")
+        return None
+
+    data = resp.json()
+
+    if not isinstance(data, dict) or "DATA" not in data:
+        print("Unexpected response shape:", data)
+        return None
+
+    return data
+
+
+async def get_all_club_limits(
+    connect_sid: str,
+    max_concurrency: int = MAX_PAGE_CONCURRENCY,
+) -> Optional[AllClubLimitsResponse]:
     """
     Fetch all club limits data from union.clubgg.com/clublimit
-    
+
+    Reads PAGE.tot_pages from the first page, then fetches the remaining
+    pages concurrently (at most `max_concurrency` in flight) and merges
+    DATA in page order.
+
     Args:
         connect_sid: Session cookie value
-        
+        max_concurrency: Max simultaneous page requests
+
     Returns:
-        AllClubLimitsResponse or None if request fails
+        AllClubLimitsResponse or None if the first page fails. If a later
+        page fails, the clubs from the pages that did load are returned and
+        the failed page numbers are listed in `missing_pages`.
     """
     try:
-        url = "https://union.clubgg.com/clublimit"
-        headers = {
-            "Accept": "*/*",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Origin": "https://union.clubgg.com",
-            "Referer": "https://union.clubgg.com/clublimit",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
-            ),
-            "Cookie": f"connect.sid={connect_sid}",
-        }
-
-        payload = {
-            "iam": "list",
-            "clubnm": "",
-            "cur_page": "1",
-            "column": "ring",
-            "asc": "2",
-        }
-
-        import asyncio
-        resp = await asyncio.to_thread(requests.post, url, headers=headers, data=payload, timeout=30)
-        
-        if resp.status_code != 200:
-            print(f"HTTP error: {resp.status_code}")
-            return None
-
-        data = resp.json()
-        
-        if not isinstance(data, dict) or "DATA" not in data:
-            print("Unexpected response shape:", data)
+        first = await _fetch_page(connect_sid, 1)
+        if first is None:
             return None
 
-        # Parse all club data
+        try:
+            tot_pages = int((first.get("PAGE") or {}).get("tot_pages") or 1)
+        except (TypeError, ValueError):
+            tot_pages = 1
+
+        pages: List[Optional[Dict[str, Any]]] = [first]
+        missing: List[int] = []
+        if tot_pages > 1:
+            sem = asyncio.Semaphore(max(1, max_concurrency))
+
+            async def _bounded(page: int) -> Optional[Dict[str, Any]]:
+                # A failed page (non-200, bad JSON, timeout) counts as missing
+                # instead of failing the whole sweep
+                async with sem:
+                    try:
+                        return await _fetch_page(connect_sid, page)
+                    except SessionExpiredError:
+                        raise
+                    except Exception as e:
+                        print(f"get_all_club_limits: page {page} error:", e)
+                        return None
+
+            pages += await asyncio.gather(*(_bounded(p) for p in range(2, tot_pages + 1)))
+
+            missing = [i + 1 for i, page in enumerate(pages) if page is None]
+            if missing:
+                print(f"get_all_club_limits: pages {missing} of {tot_pages} failed; result is partial")
+
+        # Parse all club data; the list is sorted by a live column, so a club
+        # can move between pages mid-fetch - keep the first copy of each cno
         club_data_list = []
-        for item in data.get("DATA", []):
-            club_data = _safe_make_club_data(item)
-            if club_data:
-                club_data_list.append(club_data)
+        seen = set()
+        for page in pages:
+            for item in (page or {}).get("DATA", []):
+                club_data = _safe_make_club_data(item)
+                if club_data and club_data.cno not in seen:
+                    seen.add(club_data.cno)
+                    club_data_list.append(club_data)
 
         return AllClubLimitsResponse(
-            COMM=data.get("COMM", {}),
-            PAGE=data.get("PAGE", {}),
-            DATA=club_data_list
+            COMM=first.get("COMM", {}),
+            PAGE=first.get("PAGE", {}),
+            DATA=club_data_list,
+            missing_pages=missing,
         )
 
+    except SessionExpiredError:
+        raise
     except Exception as e:
         print("get_all_club_limits error:", e)
         return None
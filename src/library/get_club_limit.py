@@ -4,7 +4,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Any, Dict
 
-import requests
+import httpx
+
+from .http_client import SessionExpiredError, post_form
 
 
 @dataclass
@@ -51,27 +53,13 @@ async def get_club_limit(club_id: str, connect_sid: str) -> Optional[ClubLimitRe
         ClubLimitResponse or None if request/shape fails.
     """
     try:
-        url = "https://union.clubgg.com/clublimit"
-        headers = {
-            "Accept": "*/*",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Origin": "https://union.clubgg.com",
-            "Referer": "https://union.clubgg.com/clublimit",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
-            ),
-            "Cookie": f"connect.sid={connect_sid}",
-        }
-
         payload = {
             "iam": "view",
             "cno": str(club_id),
         }
 
         # Keep a sane timeout so we don't hang indefinitely
-        import asyncio
-        resp = await asyncio.to_thread(requests.post, url, headers=headers, data=payload, timeout=30)
+        resp = await post_form("/clublimit", payload, connect_sid, timeout=30)
 
         # API returns JSON with INFO; don't raise_for_status because
         # the server often returns 200 with error payloads.
@@ -88,22 +76,12 @@ async def get_club_limit(club_id: str, connect_sid: str) -> Optional[ClubLimitRe
 
         return ClubLimitResponse(INFO=info)
 
-    except requests.RequestException as e:
-        # Better diagnostics on HTTP layer problems
-        try:
-            # Attempt to extract partial info if available
-            status = getattr(e.response, "status_code", None)
-            headers = getattr(e.response, "headers", None)
-            body = None
-            if e.response is not None:
-                ct = e.response.headers.get("content-type", "")
-                if ct.startswith("application/json"):
-                    body = e.response.json()
-                else:
-                    body = e.response.text[:500]
-            print("Club limit request error:", {"status": status, "headers": headers, "data": body})
-        except Exception:
-            print("Club limit request error:", str(e))
+    except SessionExpiredError:
+        raise
+    except httpx.HTTPError as e:
+        # Transport problems (timeouts, connection errors). Error statuses
+        # are not raised: their bodies fail the JSON/shape checks instead
+        print("Club limit request error:", {"type": type(e).__name__, "error": str(e)})
         return None
     except Exception as e:
         print("Club limit request error:", str(e))
@@ -0,0 +1,193 @@
+# src/library/history_store.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from src.config import HISTORY_DB_PATH, HISTORY_RETENTION_DAYS
+from .get_all_club_limits import _parse_num
+
+logger = logging.getLogger(__name__)
+
+# An unchanged club is still written once per heartbeat, so a range query
+# never has to look back further than this for the value at its start
+HEARTBEAT_SECONDS = 3600
+# Downsampling: older than HOURLY_AFTER keep one row per club per hour,
+# older than DAILY_AFTER one row per club per day
+HOURLY_AFTER = 7 * 86400
+DAILY_AFTER = 90 * 86400
+MAINTENANCE_INTERVAL = 3600
+
+# (ring_pnl, tourney_pnl, win_limit, loss_limit) in cents
+Values = Tuple[int, int, int, int]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS club_history (
+    club_id     INTEGER NOT NULL,
+    ts          INTEGER NOT NULL,
+    ring_pnl    INTEGER NOT NULL,
+    tourney_pnl INTEGER NOT NULL,
+    win_limit   INTEGER NOT NULL,
+    loss_limit  INTEGER NOT NULL,
+    PRIMARY KEY (club_id, ts)
+) WITHOUT ROWID
+"""
+
+
+def _cents(value) -> int:
+    return int(round(_parse_num(value) * 100))
+
+
+@dataclass(frozen=True)
+class HistoryPoint:
+    ts: int
+    ring_pnl: float
+    tourney_pnl: float
+    win_limit: float
+    loss_limit: float
+
+    @property
+    def total_pnl(self) -> float:
+        return self.ring_pnl + self.tourney_pnl
+
+
+class HistoryStore:
+    """
+    Append-only per-club history of the /clublimit sweep in SQLite.
+
+    Rows are keyed (club_id, ts) in a WITHOUT ROWID table, so a club's rows
+    are stored contiguously and "club X between A and B" is one index range
+    scan. Values are integer cents. A row is only written when a club's
+    values change (or once per HEARTBEAT_SECONDS); a reading holds until the
+    next row, which `range()` accounts for by also returning the row just
+    before the window. `maintain()` thins old rows to hourly and then daily
+    resolution and drops anything past the retention period.
+
+    All SQLite work runs in a worker thread; use the async methods from the
+    event loop.
+    """
+
+    def __init__(self, path: str = HISTORY_DB_PATH, retention_days: int = HISTORY_RETENTION_DAYS):
+        self.path = path
+        self.retention = retention_days * 86400 if retention_days > 0 else 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last: Dict[int, Tuple[int, Values]] = {}
+        self._last_maintenance = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            # Prime the change detector with each club's latest row
+            rows = conn.execute(
+                "SELECT h.club_id, h.ts, h.ring_pnl, h.tourney_pnl, h.win_limit, h.loss_limit "
+                "FROM club_history h "
+                "JOIN (SELECT club_id, MAX(ts) AS ts FROM club_history GROUP BY club_id) m "
+                "ON h.club_id = m.club_id AND h.ts = m.ts"
+            ).fetchall()
+            self._last = {r[0]: (r[1], tuple(r[2:])) for r in rows}
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def write(self, rows: List[Tuple[int, Values]], ts: int) -> int:
+        """Store the rows that changed or are due a heartbeat; returns how many."""
+        with self._lock:
+            conn = self._connect()
+            batch = []
+            for club_id, values in rows:
+                last = self._last.get(club_id)
+                if last and last[1] == values and ts - last[0] < HEARTBEAT_SECONDS:
+                    continue
+                if last and ts <= last[0]:
+                    continue
+                batch.append((club_id, ts) + values)
+                self._last[club_id] = (ts, values)
+            if batch:
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO club_history VALUES (?, ?, ?, ?, ?, ?)", batch)
+            return len(batch)
+
+    def range(self, club_id: int, start: int, end: int) -> List[HistoryPoint]:
+        """Readings for `club_id` in [start, end], plus the one in force at `start`."""
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT * FROM ("
+                " SELECT ts, ring_pnl, tourney_pnl, win_limit, loss_limit FROM club_history"
+                " WHERE club_id = ? AND ts < ? ORDER BY ts DESC LIMIT 1"
+                ") UNION ALL "
+                "SELECT ts, ring_pnl, tourney_pnl, win_limit, loss_limit FROM club_history"
+                " WHERE club_id = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (int(club_id), int(start), int(club_id), int(start), int(end)),
+            ).fetchall()
+        return [HistoryPoint(r[0], r[1] / 100, r[2] / 100, r[3] / 100, r[4] / 100) for r in rows]
+
+    def downsample(self, now: Optional[float] = None) -> int:
+        """Thin old rows (keep the last per club per hour/day) and apply retention."""
+        now = int(time.time() if now is None else now)
+        removed = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for older_than, bucket in ((DAILY_AFTER, 86400), (HOURLY_AFTER, 3600)):
+                    cutoff = now - older_than
+                    cur = conn.execute(
+                        "DELETE FROM club_history WHERE ts < ? AND (club_id, ts) NOT IN ("
+                        " SELECT club_id, MAX(ts) FROM club_history WHERE ts < ?"
+                        " GROUP BY club_id, ts / ?)",
+                        (cutoff, cutoff, bucket),
+                    )
+                    removed += cur.rowcount
+                if self.retention:
+                    cur = conn.execute("DELETE FROM club_history WHERE ts < ?", (now - self.retention,))
+                    removed += cur.rowcount
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def record_snapshot(self, snapshot) -> int:
+        """Append one ClubSnapshot; runs downsampling at most once an hour."""
+        if not self.enabled or snapshot is None:
+            return 0
+        ts = int(snapshot.taken_at)
+        rows = [
+            (int(club.cno), (_cents(club.f4), _cents(club.f5), _cents(club.f7), _cents(club.f6)))
+            for club in snapshot.clubs
+        ]
+        try:
+            written = await asyncio.to_thread(self.write, rows, ts)
+            if time.monotonic() - self._last_maintenance >= MAINTENANCE_INTERVAL:
+                self._last_maintenance = time.monotonic()
+                removed = await asyncio.to_thread(self.downsample)
+                if removed:
+                    logger.info("History downsampling removed %d rows", removed)
+            return written
+        except Exception as e:
+            logger.error("Failed to record club history: %s", e)
+            return 0
+
+    async def query(self, club_id: int, start: float, end: Optional[float] = None) -> List[HistoryPoint]:
+        if not self.enabled:
+            return []
+        end = time.time() if end is None else end
+        return await asyncio.to_thread(self.range, club_id, int(start), int(end))
+
+
+club_history = HistoryStore()
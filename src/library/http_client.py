@@ -0,0 +1,135 @@
+# src/library/http_client.py
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://union.clubgg.com"
+
+BASE_HEADERS = {
+    "Accept": "*/*",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    "Origin": BASE_URL,
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/139.0.0.0 Safari/537.36"
+    ),
+}
+
+DEFAULT_TIMEOUT = 30.0
+
+# Keep-alive pool sized for command bursts plus the alert sweep
+POOL_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=60.0,
+)
+
+# HTTP/2 is optional: httpx needs the h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class SessionExpiredError(Exception):
+    """The union backend rejected the connect.sid (logged out / expired)."""
+
+
+def is_auth_expired(resp: httpx.Response) -> bool:
+    """
+    Heuristic for "this SID is no longer logged in". The XHR endpoints
+    answer with JSON; an expired session gets a redirect/401 or the HTML
+    login page instead.
+    """
+    if resp.status_code in (401, 403):
+        return True
+    if resp.is_redirect:
+        return "login" in resp.headers.get("location", "").lower()
+    content_type = resp.headers.get("content-type", "")
+    if content_type.startswith("text/html"):
+        return "login" in resp.text[:4000].lower()
+    return False
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def new_client(**kwargs: Any) -> httpx.AsyncClient:
+    """
+    Build an AsyncClient with the union defaults (pool limits, HTTP/2 when
+    the `h2` package is installed, base headers). Extra kwargs override them.
+    """
+    options: Dict[str, Any] = {
+        "base_url": BASE_URL,
+        "headers": BASE_HEADERS,
+        "limits": POOL_LIMITS,
+        "timeout": DEFAULT_TIMEOUT,
+        "http2": HTTP2_AVAILABLE,
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide union client, creating it on first use.
+
+    The client is bound to the running event loop; if the loop changed
+    (e.g. a second asyncio.run in scripts) a fresh client is created.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = new_client()
+        _client_loop = loop
+        logger.info("Union HTTP client created (http2=%s)", HTTP2_AVAILABLE)
+    return _client
+
+
+async def close_client() -> None:
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("Union HTTP client closed")
+    _client = None
+    _client_loop = None
+
+
+async def post_form(
+    path: str,
+    data: Dict[str, Any],
+    connect_sid: str,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> httpx.Response:
+    """
+    POST a form to a union.clubgg.com endpoint over the shared client.
+
+    Args:
+        path: Endpoint path, e.g. "/clublimit". Also used as the Referer.
+        data: Form fields.
+        connect_sid: connect.sid cookie value for this request.
+        timeout: Per-request timeout in seconds.
+
+    Returns:
+        The raw httpx.Response (status is not checked here).
+
+    Raises:
+        SessionExpiredError: the backend answered with a logged-out response.
+    """
+    # An explicit Cookie header takes precedence over the client's jar,
+    # so requests made with different SIDs never mix sessions.
+    headers = {
+        "Referer": f"{BASE_URL}{path}",
+        "Cookie": f"connect.sid={connect_sid}",
+    }
+    client = get_client()
+    resp = await client.post(path, data=data, headers=headers, timeout=timeout)
+    if is_auth_expired(resp):
+        raise SessionExpiredError(f"Session rejected by {path} (HTTP {resp.status_code})")
+    return resp
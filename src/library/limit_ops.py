@@ -0,0 +1,246 @@
+# src/library/limit_ops.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .club_limit_cache import club_limits
+from .set_limit import set_limit
+from ..utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# command -> (limit field, action)
+LIMIT_OPS: Dict[str, Tuple[str, str]] = {
+    "addwl": ("win", "add"),
+    "subwl": ("win", "sub"),
+    "setwl": ("win", "set"),
+    "addsl": ("loss", "add"),
+    "subsl": ("loss", "sub"),
+    "setsl": ("loss", "set"),
+}
+
+# Read-modify-write starts from limits at most this old (seconds); the
+# cache TTL is for display, a write must not build on a stale value
+LIMIT_READ_MAX_AGE = 0.0
+
+# Single commands for the same club arriving within this window are
+# folded into one read + one write
+LIMIT_COALESCE_SECONDS = 0.3
+
+# Bulk updates: clubs in flight at once, and clubs started per second
+# (each club is one get_club_limit, unless cached, + one set_limit request)
+BULK_LIMIT_CONCURRENCY = 4
+BULK_LIMIT_CLUBS_PER_SECOND = 3.0
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+# (display id, backend id, command, amount)
+LimitOp = Tuple[int, str, str, int]
+
+# backend id -> lock held across each read-modify-write of that club's limits
+_club_locks: Dict[str, asyncio.Lock] = {}
+# backend id -> commands waiting for the next coalesced write
+_pending_ops: Dict[str, List[Tuple[int, str, int, asyncio.Future]]] = {}
+_flush_tasks: Set[asyncio.Task] = set()
+
+
+def club_lock(backend_id: str) -> asyncio.Lock:
+    """The lock serializing limit writes for one club (one per club, kept for reuse)."""
+    return _club_locks.setdefault(str(backend_id), asyncio.Lock())
+
+
+def apply_limit_op(op: str, prev_win: int, prev_loss: int, amount: int) -> Tuple[int, int]:
+    """
+    New (win, loss) for a limit command. Negative limits grow away from
+    zero: "add" on a negative value makes it more negative, "sub" less.
+    """
+    field, action = LIMIT_OPS[op]
+    prev = prev_win if field == "win" else prev_loss
+    if action == "set":
+        new = amount
+    elif action == "add":
+        new = prev - amount if prev < 0 else prev + amount
+    else:
+        new = prev + amount if prev < 0 else prev - amount
+    return (new, prev_loss) if field == "win" else (prev_win, new)
+
+
+@dataclass
+class LimitChange:
+    club_id: int  # display id
+    backend_id: str
+    op: str = ""
+    ok: bool = False
+    name: str = ""
+    prev_win: Optional[int] = None
+    prev_loss: Optional[int] = None
+    new_win: Optional[int] = None
+    new_loss: Optional[int] = None
+    error: Optional[str] = None
+
+
+async def _apply_ops(session, backend_id: str, ops: Sequence[Tuple[int, str, int]]) -> List[LimitChange]:
+    """
+    Apply (display id, command, amount) ops to one club with a single read
+    and a single write. Each op sees the limits left by the one before it,
+    so every LimitChange shows that op's own before/after values. The
+    caller must hold club_lock(backend_id).
+    """
+    changes = [LimitChange(club_id=int(club_id), backend_id=str(backend_id), op=op) for club_id, op, _ in ops]
+
+    current = await club_limits.get(session, backend_id, max_age=LIMIT_READ_MAX_AGE)
+    if not current or not current.INFO:
+        for change in changes:
+            change.error = "Failed to fetch current limits"
+        return changes
+
+    info = current.INFO
+    win, loss = int(info.win or 0), int(info.loss or 0)
+    start = (win, loss)
+    for change, (_, op, amount) in zip(changes, ops):
+        change.name = info.nm
+        change.prev_win, change.prev_loss = win, loss
+        win, loss = apply_limit_op(op, win, loss, amount)
+        change.new_win, change.new_loss = win, loss
+
+    if (win, loss) == start:
+        # Net no-op (e.g. +1000 then -1000): nothing to write
+        error = None
+    else:
+        res = await session.call(set_limit, club_id=str(backend_id), win=win, loss=loss, include=1)
+        if not res:
+            error = "Failed to update limits (no response from server)"
+        elif not res.get("ok"):
+            error = res.get("message") or "Update rejected"
+        else:
+            error = None
+        # Keep the cached limits in step with what the backend now holds
+        if error is None:
+            club_limits.update(backend_id, win, loss)
+        else:
+            club_limits.invalidate(backend_id)
+
+    for change in changes:
+        change.ok = error is None
+        change.error = error
+    return changes
+
+
+async def change_club_limit(session, op: str, club_id: int, backend_id: str, amount: int) -> LimitChange:
+    """Read the current limits of one club, apply `op` and write them back."""
+    async with club_lock(backend_id):
+        changes = await _apply_ops(session, backend_id, [(club_id, op, amount)])
+    return changes[0]
+
+
+async def _flush_pending(session, backend_id: str, delay: float) -> None:
+    await asyncio.sleep(delay)
+    async with club_lock(backend_id):
+        # Taken under the lock: ops queued while waiting for it join this write
+        pending = _pending_ops.pop(backend_id, [])
+        try:
+            changes = await _apply_ops(session, backend_id, [(c, op, amount) for c, op, amount, _ in pending])
+        except Exception as e:
+            logger.error("Limit update failed for club %s: %s", backend_id, e)
+            changes = [
+                LimitChange(club_id=int(c), backend_id=backend_id, op=op, error=str(e))
+                for c, op, _, _ in pending
+            ]
+    for (_, _, _, future), change in zip(pending, changes):
+        if not future.done():
+            future.set_result(change)
+
+
+async def submit_limit_op(
+    session,
+    op: str,
+    club_id: int,
+    backend_id: str,
+    amount: int,
+    window: float = LIMIT_COALESCE_SECONDS,
+) -> LimitChange:
+    """
+    Queue one limit command and wait for its result.
+
+    Commands for the same club that arrive within `window` seconds of the
+    first are applied together in arrival order with one get_club_limit
+    and one set_limit carrying the net result. Writes for a club are
+    serialized with its lock, so concurrent adjustments never overwrite
+    each other.
+    """
+    backend_id = str(backend_id)
+    future = asyncio.get_running_loop().create_future()
+    if backend_id not in _pending_ops:
+        _pending_ops[backend_id] = []
+        task = asyncio.create_task(_flush_pending(session, backend_id, window))
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_tasks.discard)
+    _pending_ops[backend_id].append((int(club_id), op, amount, future))
+    return await future
+
+
+async def run_limit_ops(
+    session,
+    ops: Sequence[LimitOp],
+    max_concurrency: int = BULK_LIMIT_CONCURRENCY,
+    clubs_per_second: float = BULK_LIMIT_CLUBS_PER_SECOND,
+    on_progress: Optional[ProgressCallback] = None,
+) -> List[LimitChange]:
+    """
+    Apply many limit commands, possibly several per club.
+
+    Ops for the same club run one after another in their given order (each
+    reads the limits the previous one wrote); different clubs run
+    concurrently with at most `max_concurrency` clubs in flight, and ops
+    start at no more than `clubs_per_second`, so a bulk run never floods
+    the union backend. `on_progress(done, total)` is awaited after each op.
+    Results come back in the order of `ops`; one failure never stops the
+    others.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    bucket = TokenBucket(clubs_per_second, max(1, max_concurrency))
+    results: List[Optional[LimitChange]] = [None] * len(ops)
+    total = len(ops)
+    done = 0
+
+    by_club: Dict[str, List[int]] = {}
+    for i, (_, backend_id, _, _) in enumerate(ops):
+        by_club.setdefault(str(backend_id), []).append(i)
+
+    async def run_club(indexes: List[int]) -> None:
+        nonlocal done
+        async with semaphore:
+            for i in indexes:
+                club_id, backend_id, op, amount = ops[i]
+                while (wait := bucket.wait_time(time.monotonic())) > 0:
+                    await asyncio.sleep(wait)
+                bucket.take()
+                try:
+                    results[i] = await change_club_limit(session, op, club_id, backend_id, amount)
+                except Exception as e:
+                    logger.error("Bulk %s failed for club %s: %s", op, club_id, e)
+                    results[i] = LimitChange(club_id=int(club_id), backend_id=str(backend_id), op=op, error=str(e))
+
+                done += 1
+                if on_progress:
+                    try:
+                        await on_progress(done, total)
+                    except Exception as e:
+                        logger.warning("Bulk progress update failed: %s", e)
+
+    await asyncio.gather(*(run_club(indexes) for indexes in by_club.values()))
+    return results
+
+
+async def bulk_change_limits(
+    session,
+    op: str,
+    targets: Sequence[Tuple[int, str]],
+    amount: int,
+    **kwargs,
+) -> List[LimitChange]:
+    """Apply one limit command to many (display id, backend id) clubs; see run_limit_ops."""
+    return await run_limit_ops(session, [(c, str(b), op, amount) for c, b in targets], **kwargs)
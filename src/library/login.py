@@ -6,16 +6,19 @@ import logging
 import asyncio
 from typing import Dict, Optional
 
-import requests
+import httpx
 from src.config import CAPSOLVER_API_KEY, UNION_LOGIN_ID, UNION_LOGIN_PWD
+from src.library.http_client import new_client
 
-# If you implemented the Gmail OTP helper in Python as suggested:
-#   src/gmail/mfa.py -> fetch_clubgg_verification_code(since: datetime, timeout_seconds: int) -> str
+# Gmail OTP helper:
+#   src/library/mfa.py -> find_clubgg_verification_code(since, gmail) -> Optional[str] (single pass)
+#                         gmail_service_from_env() -> Gmail API service
 from datetime import datetime
 try:
-    from src.library.mfa import fetch_clubgg_verification_code  # noqa: F401
+    from src.library.mfa import find_clubgg_verification_code, gmail_service_from_env  # noqa: F401
 except Exception:
-    fetch_clubgg_verification_code = None  # type: ignore
+    find_clubgg_verification_code = None  # type: ignore
+    gmail_service_from_env = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +32,14 @@ LOGIN_URL = "https://union.clubgg.com/login_submit"
 LOGIN_ID = UNION_LOGIN_ID
 LOGIN_PWD = UNION_LOGIN_PWD
 
+CAPSOLVER_URL = "https://api.capsolver.com"
+CAPSOLVER_POLL_SECONDS = 3
+CAPSOLVER_MAX_POLLS = 30  # ~90s per task
+MFA_POLL_SECONDS = 3
+
+# Accept-Encoding is left to httpx so we only advertise codecs it can decode
 BASE_HEADERS = {
     "Accept": "*/*",
-    "Accept-Encoding": "gzip, deflate, br, zstd",
     "Accept-Language": "en-US,en;q=0.9",
     "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
     "Origin": "https://union.clubgg.com",
@@ -49,7 +57,7 @@ BASE_HEADERS = {
 def _parse_set_cookie_to_map(set_cookie_values: Optional[list[str]]) -> Dict[str, str]:
     """
     Parse Set-Cookie header values into a name->value map.
-    NOTE: requests already parses cookies into response.cookies; prefer that.
+    NOTE: httpx already parses cookies into response.cookies; prefer that.
     This is here only for parity with the TS version.
     """
     out: Dict[str, str] = {}
@@ -63,7 +71,7 @@ def _parse_set_cookie_to_map(set_cookie_values: Optional[list[str]]) -> Dict[str
         out[name.strip()] = value.strip()
     return out
 
-def _get_recaptcha_token_from_capsolver() -> Optional[str]:
+async def _get_recaptcha_token_from_capsolver(client: httpx.AsyncClient) -> Optional[str]:
     """
     Use CapSolver ReCaptchaV3EnterpriseTaskProxyLess to get a token.
     Return None if it fails or times out.
@@ -80,57 +88,64 @@ def _get_recaptcha_token_from_capsolver() -> Optional[str]:
                 "pageAction": PAGE_ACTION,
             },
         }
-        create = requests.post(
-            "https://api.capsolver.com/createTask",
+        create = (await client.post(
+            f"{CAPSOLVER_URL}/createTask",
             json=create_payload,
             timeout=20,
-        ).json()
+        )).json()
         task_id = create.get("taskId")
         if not task_id:
             return None
 
         # poll up to ~90s (every 3s)
-        for _ in range(30):
-            time.sleep(3)
-            res = requests.post(
-                "https://api.capsolver.com/getTaskResult",
+        for _ in range(CAPSOLVER_MAX_POLLS):
+            await asyncio.sleep(CAPSOLVER_POLL_SECONDS)
+            res = (await client.post(
+                f"{CAPSOLVER_URL}/getTaskResult",
                 json={"clientKey": API_KEY, "taskId": task_id},
                 timeout=20,
-            ).json()
+            )).json()
             if res.get("status") == "ready":
                 return (res.get("solution") or {}).get("gRecaptchaResponse")
         return None
+    except asyncio.CancelledError:
+        raise
     except Exception:
         return None
 
 
-def _get_recaptcha_token_forever_from_capsolver() -> str:
+async def _get_recaptcha_token_forever_from_capsolver(client: httpx.AsyncClient) -> str:
     attempt = 0
     while True:
         attempt += 1
-        token = _get_recaptcha_token_from_capsolver()
+        token = await _get_recaptcha_token_from_capsolver(client)
         if token:
             return token
         backoff_ms = min(30_000, 1000 * attempt)  # 1s, 2s, … up to 30s
         logger.warning("CapSolver attempt %s failed; retrying in %sms", attempt, backoff_ms)
-        time.sleep(backoff_ms / 1000.0)
+        await asyncio.sleep(backoff_ms / 1000.0)
 
 
 async def _fetch_email_mfa_code(since: datetime, timeout_ms: int = 120_000) -> str:
     """
     Fetch the ClubGG 6-digit code from Gmail using src/library/mfa.py.
-    mfa.fetch_clubgg_verification_code(since, timeout) is blocking → run in thread.
+    The Gmail service (and its OAuth token) is built once and reused by
+    every pass. Each Gmail pass is blocking → run in thread; the wait
+    between passes is an asyncio.sleep so the poll can be cancelled.
     """
-    if not fetch_clubgg_verification_code:
+    if not find_clubgg_verification_code:
         raise RuntimeError(
             "Gmail MFA helper missing. Implement src/library/mfa.py and export "
-            "`fetch_clubgg_verification_code(since, timeout)`."
+            "`find_clubgg_verification_code(since)`."
         )
-    # call with positional args: (since, timeout_seconds)
-    code = await asyncio.to_thread(fetch_clubgg_verification_code, since, timeout_ms // 1000)
-    if not code:
-        raise TimeoutError("No verification code received in time")
-    return code
+    deadline = time.monotonic() + timeout_ms / 1000.0
+    gmail = await asyncio.to_thread(gmail_service_from_env)
+    while time.monotonic() < deadline:
+        code = await asyncio.to_thread(find_clubgg_verification_code, since, gmail)
+        if code:
+            return code
+        await asyncio.sleep(MFA_POLL_SECONDS)
+    raise TimeoutError("No verification code received in time")
 
 
 def _is_recaptcha_failed(payload: dict) -> bool:
@@ -170,14 +185,18 @@ async def login_and_get_sid() -> str:
     if not LOGIN_ID or not LOGIN_PWD:
         raise RuntimeError("UNION_LOGIN_ID / UNION_LOGIN_PWD not set in environment")
 
-    session = requests.Session()
+    # Dedicated client: the login cookie jar must not leak into the shared one
+    async with new_client(headers=None, follow_redirects=True) as session:
+        return await _login_with_session(session)
+
 
+async def _login_with_session(session: httpx.AsyncClient) -> str:
     # ---- STEP 1: retry UNTIL reCAPTCHA is accepted ----
     step_attempt = 0
     while True:
         step_attempt += 1
         # You can choose either: _get_recaptcha_token_forever_from_capsolver() or _get_recaptcha_token_forever_hybrid()
-        recaptcha = _get_recaptcha_token_forever_from_capsolver()
+        recaptcha = await _get_recaptcha_token_forever_from_capsolver(session)
 
         form = {
             "id": LOGIN_ID,
@@ -189,7 +208,7 @@ async def login_and_get_sid() -> str:
             "method_type": "",
         }
 
-        r1 = session.post(LOGIN_URL, data=form, headers=BASE_HEADERS)
+        r1 = await session.post(LOGIN_URL, data=form, headers=BASE_HEADERS)
         # Do not raise; we mimic the TS `validateStatus: () => true`
         try:
             step1 = r1.json()
@@ -204,7 +223,7 @@ async def login_and_get_sid() -> str:
                 step_attempt,
                 backoff,
             )
-            time.sleep(backoff / 1000.0)
+            await asyncio.sleep(backoff / 1000.0)
             continue
 
         # Check for rate limiting
@@ -213,10 +232,10 @@ async def login_and_get_sid() -> str:
             step1.get("data", {}).get("code") == "RESEND_TERM_LIMITED"):
             remaining_time = step1.get("data", {}).get("remainingTime", 60)
             logger.warning(f"Rate limited. Waiting {remaining_time} seconds...")
-            time.sleep(remaining_time)
+            await asyncio.sleep(remaining_time)
             continue
 
-        # cookies from response (requests parses Set-Cookie)
+        # cookies from response (httpx parses Set-Cookie)
         connect_sid = r1.cookies.get("connect.sid")
         # If no MFA requested and err==0, we’re done
         if connect_sid and step1.get("err") == 0 and not (step1.get("data") or {}).get("code"):
@@ -242,7 +261,7 @@ async def login_and_get_sid() -> str:
             mfa_code = await _fetch_email_mfa_code(mfa_requested_at)  # waits/polls until code available
             logger.info(f"🔐 MFA code fetched: {mfa_code}")
         
-        recaptcha = _get_recaptcha_token_forever_from_capsolver()  # usually ignored in step2, but safe
+        recaptcha = await _get_recaptcha_token_forever_from_capsolver(session)  # usually ignored in step2, but safe
 
         form2 = {
             "id": LOGIN_ID,
@@ -254,7 +273,7 @@ async def login_and_get_sid() -> str:
             "method_type": "",
         }
 
-        r2 = session.post(LOGIN_URL, data=form2, headers=BASE_HEADERS)
+        r2 = await session.post(LOGIN_URL, data=form2, headers=BASE_HEADERS)
         try:
             step2 = r2.json()
         except Exception:
@@ -267,7 +286,7 @@ async def login_and_get_sid() -> str:
                 step2_attempt,
                 backoff,
             )
-            time.sleep(backoff / 1000.0)
+            await asyncio.sleep(backoff / 1000.0)
             continue
 
         if _is_unmatched_verification_code(step2):
@@ -275,7 +294,7 @@ async def login_and_get_sid() -> str:
                 "MFA code unmatched (attempt %s); fetching a new code...",
                 step2_attempt,
             )
-            time.sleep(2)
+            await asyncio.sleep(2)
             # Reset MFA code to fetch a new one
             mfa_code = None
             mfa_requested_at = datetime.now()
@@ -287,11 +306,7 @@ async def login_and_get_sid() -> str:
             return connect_sid
 
         # Sometimes Set-Cookie headers may not be parsed (rare); try manual parse
-        # NOTE: requests doesn't expose getlist on headers; use raw if available
-        try:
-            set_cookie_values = r2.raw.headers.get_all("Set-Cookie")  # type: ignore[attr-defined]
-        except Exception:
-            set_cookie_values = None
+        set_cookie_values = r2.headers.get_list("set-cookie")
         cookie_map = _parse_set_cookie_to_map(set_cookie_values)
         if cookie_map.get("connect.sid"):
             return cookie_map["connect.sid"]
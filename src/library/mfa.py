@@ -12,22 +12,34 @@ def gmail_service_from_env():
     })
     return build("gmail", "v1", credentials=creds)
 
+QUERY = 'from:support@clubgg.com subject:"ClubGG Email Verification Code" newer_than:1d'
+
+def find_clubgg_verification_code(since, gmail=None):
+    """
+    Single Gmail pass (no sleeping): return the newest code sent after
+    `since` (10s grace), or None. Callers own the polling loop.
+    """
+    gmail = gmail or gmail_service_from_env()
+    msgs = gmail.users().messages().list(userId="me", q=QUERY, maxResults=10).execute()
+    for m in msgs.get("messages", []):
+        msg = gmail.users().messages().get(userId="me", id=m["id"], format="full").execute()
+        internal_date = int(msg.get("internalDate", "0")) / 1000
+        if internal_date + 10 <= since.timestamp():
+            continue
+        text = extract_text(msg)
+        m = re.search(r"\b(\d{6})\b", text)
+        if m:
+            return m.group(1)
+    return None
+
 def fetch_clubgg_verification_code(since, timeout=120):
     gmail = gmail_service_from_env()
     deadline = time.time() + timeout
-    query = 'from:support@clubgg.com subject:"ClubGG Email Verification Code" newer_than:1d'
 
     while time.time() < deadline:
-        msgs = gmail.users().messages().list(userId="me", q=query, maxResults=10).execute()
-        for m in msgs.get("messages", []):
-            msg = gmail.users().messages().get(userId="me", id=m["id"], format="full").execute()
-            internal_date = int(msg.get("internalDate", "0")) / 1000
-            if internal_date + 10 <= since.timestamp():
-                continue
-            text = extract_text(msg)
-            m = re.search(r"\b(\d{6})\b", text)
-            if m:
-                return m.group(1)
+        code = find_clubgg_verification_code(since, gmail)
+        if code:
+            return code
         time.sleep(3)
     raise TimeoutError("Timed out waiting for ClubGG verification email")
 
@@ -1,8 +1,39 @@
 # Python 3.8+
-from typing import Any, Dict, List, Optional, Union
-import requests
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .http_client import SessionExpiredError, post_form
 
 SendCreditResult = Dict[str, Any]
+BatchCreditResult = Dict[str, Any]
+
+# Clubs packed into one /counteru request (clubstr "id,amt|id,amt|...")
+SEND_CREDIT_BATCH_SIZE = 50
+
+
+def _parse_counteru(data: Dict[str, Any]) -> Tuple[Optional[str], List[str], Optional[Union[int, float]]]:
+    """(message with HTML stripped, success club ids as strings, balance)"""
+    raw_msg = data.get("msg")
+    if isinstance(raw_msg, list):
+        msg = " ".join(str(x) for x in raw_msg)
+    else:
+        msg = str(raw_msg) if raw_msg is not None else None
+
+    # Strip simple HTML tags if present
+    if isinstance(msg, str):
+        msg = re.sub(r"<[^>]*>", "", msg)
+
+    success_list = data.get("success_list") or []
+    if not isinstance(success_list, list):
+        success_list = []
+
+    balance = None
+    dat = data.get("data")
+    if isinstance(dat, dict):
+        balance = dat.get("balance", None)
+
+    return msg, [str(x) for x in success_list], balance
+
 
 async def send_credit(
     connect_sid: str,
@@ -29,58 +60,24 @@ async def send_credit(
         or None on transport-level failure.
     """
     try:
-        url = "https://union.clubgg.com/counteru"
-        headers = {
-            "Accept": "*/*",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Origin": "https://union.clubgg.com",
-            "Referer": "https://union.clubgg.com/counteru",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/139.0.0.0 Safari/537.36"
-            ),
-            "Cookie": f"connect.sid={connect_sid}",
-        }
-
         payload = {
             "iam": "sendout",
-            # supports multiple like "id,amt|id,amt" if needed
+            # supports multiple like "id,amt|id,amt" (see send_credit_many)
             "clubstr": f"{club_id},{amount}",
             "note": note,
         }
 
-        import asyncio
-        resp = await asyncio.to_thread(requests.post, url, headers=headers, data=payload, timeout=30)
+        resp = await post_form("/counteru", payload, connect_sid, timeout=30)
         resp.raise_for_status()
         data = resp.json()
 
-        # Normalize
-        raw_msg = data.get("msg")
-        if isinstance(raw_msg, list):
-            msg = " ".join(str(x) for x in raw_msg)
-        else:
-            msg = str(raw_msg) if raw_msg is not None else None
-
-        # Strip simple HTML tags if present
-        if isinstance(msg, str):
-            import re
-            msg = re.sub(r"<[^>]*>", "", msg)
-
-        success_list = data.get("success_list") or []
-        if not isinstance(success_list, list):
-            success_list = []
+        msg, success_list, balance = _parse_counteru(data)
 
         ok = (
             (isinstance(data.get("err"), int) and data.get("err") == 0)
-            or (club_id in success_list)
+            or (str(club_id) in success_list)
         )
 
-        balance = None
-        dat = data.get("data")
-        if isinstance(dat, dict):
-            balance = dat.get("balance", None)
-
         return {
             "ok": bool(ok),
             "message": msg,
@@ -89,7 +86,132 @@ async def send_credit(
             "raw": data,
         }
 
+    except SessionExpiredError:
+        raise
     except Exception as e:
         # Transport / parsing error
         print("Send credit request error:", e)
         return None
+
+
+async def send_credit_many(
+    connect_sid: str,
+    transfers: Sequence[Tuple[str, int]],
+    note: str = ""
+) -> Optional[SendCreditResult]:
+    """
+    Send credits to several clubs in ONE /counteru request.
+
+    Args:
+        connect_sid: The value of the `connect.sid` cookie.
+        transfers: (club backend id, amount) pairs, packed as "id,amt|id,amt".
+        note: Optional note string.
+
+    Returns:
+        A dict with:
+          - ok: bool (every club succeeded)
+          - message: Optional[str] (HTML stripped)
+          - successClubIds: List[str]
+          - failedClubIds: List[str]
+          - balance: Optional[Union[int,float]]
+          - raw: Any (full JSON response)
+        or None on transport-level failure (outcome unknown).
+    """
+    try:
+        payload = {
+            "iam": "sendout",
+            "clubstr": "|".join(f"{club_id},{amount}" for club_id, amount in transfers),
+            "note": note,
+        }
+
+        resp = await post_form("/counteru", payload, connect_sid, timeout=60)
+        resp.raise_for_status()
+        data = resp.json()
+
+        msg, success_list, balance = _parse_counteru(data)
+        club_ids = [str(club_id) for club_id, _ in transfers]
+
+        if success_list:
+            succeeded = set(success_list)
+        elif isinstance(data.get("err"), int) and data.get("err") == 0:
+            # No per-club list, but the request as a whole succeeded
+            succeeded = set(club_ids)
+        else:
+            succeeded = set()
+
+        return {
+            "ok": all(c in succeeded for c in club_ids),
+            "message": msg,
+            "successClubIds": [c for c in club_ids if c in succeeded],
+            "failedClubIds": [c for c in club_ids if c not in succeeded],
+            "balance": balance,
+            "raw": data,
+        }
+
+    except SessionExpiredError:
+        raise
+    except Exception as e:
+        # Transport / parsing error
+        print("Send credit batch request error:", e)
+        return None
+
+
+async def send_credit_batch(
+    session,
+    transfers: Sequence[Tuple[str, int]],
+    note: str = "",
+    batch_size: int = SEND_CREDIT_BATCH_SIZE,
+) -> BatchCreditResult:
+    """
+    Send credits to many clubs using as few /counteru requests as possible.
+
+    Requests go out one chunk at a time through `session.call`, so an
+    expired session only re-sends the chunk the backend rejected, never
+    one that already went through.
+
+    Returns:
+        A dict with:
+          - ok: bool (every club succeeded)
+          - succeeded: List[str] club backend ids
+          - failed: Dict[str, Optional[str]] club id -> backend message
+            (clubs after a chunk that could not be sent are failed too)
+          - unknown: List[str] club ids whose request got no usable
+            response; they may or may not have been credited
+          - balance: last balance reported, if any
+          - requests: number of requests sent
+    """
+    succeeded: List[str] = []
+    failed: Dict[str, Optional[str]] = {}
+    unknown: List[str] = []
+    balance = None
+    requests = 0
+
+    for start in range(0, len(transfers), batch_size):
+        chunk = [(str(c), int(a)) for c, a in transfers[start:start + batch_size]]
+        requests += 1
+        try:
+            res = await session.call(send_credit_many, transfers=chunk, note=note)
+        except Exception as e:
+            # Rejected before sending (e.g. session could not be renewed):
+            # this chunk and the rest were not sent
+            print("Send credit batch stopped:", e)
+            for club_id, _ in transfers[start:]:
+                failed[str(club_id)] = f"not sent ({e})"
+            break
+        if not res:
+            unknown.extend(c for c, _ in chunk)
+            continue
+        succeeded.extend(res["successClubIds"])
+        for club_id in res["failedClubIds"]:
+            failed[club_id] = res.get("message")
+        if res.get("balance") is not None:
+            balance = res["balance"]
+
+    return {
+        "ok": not failed and not unknown,
+        "succeeded": succeeded,
+        "failed": failed,
+        "unknown": unknown,
+        "balance": balance,
+        "requests": requests,
+    }
@@ -0,0 +1,239 @@
+# src/library/session_manager.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.config import (
+    SESSION_CHECK_INTERVAL_SECONDS,
+    SESSION_FILE,
+    SESSION_MAX_AGE_SECONDS,
+    SESSION_PREWARM_SECONDS,
+)
+from .http_client import SessionExpiredError, post_form
+from .login import login_and_get_sid
+
+logger = logging.getLogger(__name__)
+
+RotateListener = Callable[[str], Any]
+
+
+async def probe_session(connect_sid: str) -> bool:
+    """
+    One cheap request (first page of /clublimit) to check that a SID is
+    still logged in. Transport errors count as "unknown" → True, so a
+    network blip never triggers a paid captcha login.
+    """
+    payload = {
+        "iam": "list",
+        "clubnm": "",
+        "cur_page": "1",
+        "column": "ring",
+        "asc": "2",
+    }
+    try:
+        resp = await post_form("/clublimit", payload, connect_sid, timeout=15)
+        data = resp.json()
+        return isinstance(data, dict) and "DATA" in data
+    except SessionExpiredError:
+        return False
+    except ValueError:
+        # 200 but not JSON: treat as logged out
+        return False
+    except Exception as e:
+        logger.warning("Session probe inconclusive: %s", e)
+        return True
+
+
+class SessionStore:
+    """
+    Tiny JSON file holding the last good SID and when it was issued
+    (wall-clock), written atomically with owner-only permissions.
+    """
+
+    def __init__(self, path: str = SESSION_FILE):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable session file %s: %s", self.path, e)
+            return None
+        if not isinstance(data, dict) or not data.get("sid"):
+            return None
+        return data
+
+    def save(self, sid: str, issued_at: float) -> None:
+        tmp = f"{self.path}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"sid": sid, "issued_at": issued_at}, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning("Could not persist session to %s: %s", self.path, e)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Could not remove session file %s: %s", self.path, e)
+
+
+class SessionManager:
+    """
+    Owns the union connect.sid.
+
+    - Tracks SID age and when it was last verified.
+    - Pre-warms a replacement before `max_age`, and keeps serving the old
+      SID until the new one has been verified with a probe.
+    - `call()` runs a library function with the current SID and retries it
+      once with a fresh SID if the backend reports the session expired.
+    - Concurrent refreshes are coalesced into a single login.
+    - With a `store`, the SID survives restarts: `start()` reuses the saved
+      SID if one probe says it is still logged in.
+    """
+
+    def __init__(
+        self,
+        login: Callable[[], Awaitable[str]] = login_and_get_sid,
+        probe: Callable[[str], Awaitable[bool]] = probe_session,
+        max_age: float = SESSION_MAX_AGE_SECONDS,
+        prewarm: float = SESSION_PREWARM_SECONDS,
+        check_interval: float = SESSION_CHECK_INTERVAL_SECONDS,
+        store: Optional[SessionStore] = None,
+    ):
+        self._login = login
+        self._probe = probe
+        self.max_age = max_age
+        self.prewarm = prewarm
+        self.check_interval = check_interval
+        self.store = store
+
+        self._sid: Optional[str] = None
+        self._issued_at = 0.0
+        self._verified_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._listeners: List[RotateListener] = []
+
+    @property
+    def sid(self) -> Optional[str]:
+        return self._sid
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self._issued_at if self._sid else 0.0
+
+    def add_listener(self, listener: RotateListener) -> None:
+        """`listener(new_sid)` is called (or awaited) after every rotation."""
+        self._listeners.append(listener)
+
+    async def start(self) -> str:
+        restored = await self._restore()
+        if restored:
+            return restored
+        return await self.refresh("startup")
+
+    async def _restore(self) -> Optional[str]:
+        saved = self.store.load() if self.store else None
+        if not saved:
+            return None
+        sid = str(saved["sid"])
+        age = max(0.0, time.time() - float(saved.get("issued_at") or 0))
+        if age >= self.max_age:
+            logger.info("Saved session is %.0fs old; logging in again", age)
+            return None
+        if not await self._probe(sid):
+            logger.info("Saved session is no longer valid; logging in again")
+            self.store.clear()
+            return None
+        logger.info("Reusing saved session (age %.0fs)", age)
+        await self._install(sid, age=age, persist=False)
+        return sid
+
+    async def get_sid(self) -> str:
+        if self._sid:
+            return self._sid
+        return await self.refresh("no session")
+
+    async def refresh(self, reason: str) -> str:
+        """Log in for a new SID; callers arriving mid-login share the result."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._rotate(reason))
+        return await asyncio.shield(self._refresh_task)
+
+    async def _rotate(self, reason: str) -> str:
+        logger.info("Rotating session (%s)", reason)
+        sid = await self._login()
+        if not await self._probe(sid):
+            raise RuntimeError("New session failed verification")
+        await self._install(sid)
+        return sid
+
+    async def _install(self, sid: str, age: float = 0.0, persist: bool = True) -> None:
+        now = time.monotonic()
+        self._sid = sid
+        self._issued_at = now - age
+        self._verified_at = now
+        logger.info("Session established")
+        if persist and self.store:
+            self.store.save(sid, time.time() - age)
+        for listener in self._listeners:
+            try:
+                result = listener(sid)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error("Session listener failed: %s", e)
+
+    async def invalidate(self, sid: str) -> str:
+        """
+        Report that `sid` was rejected. Only triggers a login if it is still
+        the current SID; otherwise a rotation already happened.
+        """
+        if sid != self._sid:
+            return await self.get_sid()
+        return await self.refresh("expired")
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run `func(*args, connect_sid=<sid>, **kwargs)`; on SessionExpiredError
+        re-login (shared) and retry exactly once.
+        """
+        sid = await self.get_sid()
+        try:
+            return await func(*args, connect_sid=sid, **kwargs)
+        except SessionExpiredError:
+            logger.warning("Session expired during %s; retrying once", getattr(func, "__name__", func))
+            sid = await self.invalidate(sid)
+            return await func(*args, connect_sid=sid, **kwargs)
+
+    async def run(self) -> None:
+        """Background loop: pre-warm before max_age, probe validity in between."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                if not self._sid:
+                    await self.refresh("no session")
+                elif self.age >= self.max_age - self.prewarm:
+                    await self.refresh("pre-warm")
+                elif time.monotonic() - self._verified_at >= self.check_interval:
+                    sid = self._sid
+                    if await self._probe(sid):
+                        self._verified_at = time.monotonic()
+                    else:
+                        await self.invalidate(sid)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Session maintenance failed: %s", e)
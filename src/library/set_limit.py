@@ -1,8 +1,9 @@
 # Python 3.8+
 from typing import Any, Dict, Optional, Union
-import requests
 import re
 
+from .http_client import SessionExpiredError, post_form
+
 SetLimitResult = Dict[str, Any]
 
 async def set_limit(
@@ -30,20 +31,6 @@ async def set_limit(
         or None on transport-level failure (network/parse error).
     """
     try:
-        url = "https://union.clubgg.com/clublimit"
-        headers = {
-            "Accept": "*/*",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "Origin": "https://union.clubgg.com",
-            "Referer": "https://union.clubgg.com/clublimit",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/139.0.0.0 Safari/537.36"
-            ),
-            "Cookie": f"connect.sid={connect_sid}",
-        }
-
         payload = {
             "iam": "edit",
             "cno": str(club_id),
@@ -52,22 +39,15 @@ async def set_limit(
             "include": str(include),
         }
 
-        import asyncio
-        resp = await asyncio.to_thread(requests.post, url, headers=headers, data=payload, timeout=30)
+        resp = await post_form("/clublimit", payload, connect_sid, timeout=30)
         resp.raise_for_status()
         data = resp.json()
 
-        # Attempt a generic success detection:
-        # Some endpoints return {err:0}, others just return INFO or silent success.
-        ok = False
-        if isinstance(data, dict):
-            if data.get("err") == 0:
-                ok = True
-            elif "INFO" in data or data.get("success") == 1:
-                ok = True
-            else:
-                # If we can't tell, consider HTTP 200 with a dict as tentative success
-                ok = True
+        # Success is {err:0}, a returned INFO or {success:1}; anything else
+        # (e.g. {err:1, msg:...}) is a rejection
+        ok = isinstance(data, dict) and (
+            data.get("err") == 0 or "INFO" in data or data.get("success") == 1
+        )
 
         # Normalize message (strip basic HTML if present)
         raw_msg = data.get("msg") if isinstance(data, dict) else None
@@ -87,6 +67,8 @@ async def set_limit(
             "raw": data,
         }
 
+    except SessionExpiredError:
+        raise
     except Exception as e:
         print("Set limit request error:", e)
         return None
@@ -2,11 +2,9 @@
 from typing import Dict, Optional
 from telegram import Update
 
-# You should implement these in your Python roles module
-# with the same semantics as your TS version.
-from src.utils.roles import get_user_role, has_permission
-# get_user_role(user_id: int) -> Optional[{"userId": int, "role": str, "clubs": Optional[list[int]]}]
-# has_permission(user_id: int, capability: str) -> bool
+# Precompiled per-user access (merged across all of the user's role entries)
+from src.utils.roles import get_user_access
+# get_user_access(user_id: int) -> Optional[UserAccess]
 
 # Command -> capability mapping (kept 1:1 with your TS)
 CAP_MAP: Dict[str, str] = {
@@ -17,7 +15,9 @@ CAP_MAP: Dict[str, str] = {
     "addsl": "set-club-limit",
     "subsl": "set-club-limit",
     "setsl": "set-club-limit",
+    "bulklimit": "set-club-limit",
     "scr": "send-credit",
+    "scrbatch": "send-credit",
     "ccr": "claim-credit",
 }
 
@@ -38,24 +38,18 @@ def can_manage_club(update: Update, command: str, club_id: int) -> Dict[str, Opt
         return {"allowed": False, "reason": "User not found"}
 
     user_id = int(user.id)
-    role_obj = get_user_role(user_id)
-    if not role_obj:
+    access = get_user_access(user_id)
+    if not access:
         return {"allowed": False, "reason": "You are not authorized to use this bot"}
 
     # Map command to capability and check role permission
     cap = CAP_MAP.get(command, command)
-    if not has_permission(user_id, cap):
+    if not access.can(cap):
         return {"allowed": False, "reason": "Command not permitted for your role"}
 
-    # Scope check: Union Head can access all, others must have the club in their list
-    if role_obj.get("role") != "Union Head":
-        clubs = role_obj.get("clubs") or []
-        try:
-            # Ensure ints for comparison
-            clubs_int = [int(x) for x in clubs]
-        except Exception:
-            clubs_int = []
-        if int(club_id) not in clubs_int:
-            return {"allowed": False, "reason": "You do not have permission to access this club"}
+    # Scope check: Union Head can access all, others must have the club in
+    # the scope of a role that grants this capability
+    if not access.can_access(cap, int(club_id)):
+        return {"allowed": False, "reason": "You do not have permission to access this club"}
 
     return {"allowed": True, "reason": None}
@@ -0,0 +1,21 @@
+from typing import List
+
+# Per-item lines shown in a reply before summarising the rest
+MAX_LISTED = 30
+
+
+def md_safe(text: str) -> str:
+    """Neutralise Markdown control characters in backend text."""
+    for ch in ("_", "*", "`", "["):
+        text = text.replace(ch, " ")
+    return text
+
+
+def md_listing(title: str, lines: List[str], limit: int = MAX_LISTED) -> str:
+    """A titled block of lines, truncated to `limit` with an "…and N more"."""
+    shown = lines[:limit]
+    more = len(lines) - len(shown)
+    text = f"\n{title}\n" + "\n".join(shown)
+    if more > 0:
+        text += f"\n…and {more} more"
+    return text + "\n"
@@ -1,5 +1,5 @@
 import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 def parse_args_safe(text: str, min_args: int = 0) -> Optional[List[str]]:
     """
@@ -32,3 +32,42 @@ def clean_id(s: str) -> str:
     Clean a club ID by removing '#' prefix, commas, and extra whitespace.
     """
     return s.lstrip("#").replace(",", "").strip()
+
+
+def parse_club_amounts(text: str) -> Tuple[List[Tuple[int, int]], List[str]]:
+    """
+    Parse (club_id, amount) pairs from a command message, one pair per
+    line and/or as id:amount tokens:
+
+        /scrbatch 492536:1000 123456:500
+        /scrbatch
+        492536 1,000
+        123456 500
+
+    Returns:
+        (pairs, errors) where errors are the entries that did not parse.
+    """
+    pairs: List[Tuple[int, int]] = []
+    errors: List[str] = []
+    if not text:
+        return pairs, errors
+
+    lines = text.replace("\u00A0", " ").splitlines()
+    # Skip the command itself
+    first = lines[0].strip().split(maxsplit=1) if lines else []
+    lines = ([first[1]] if len(first) > 1 else []) + lines[1:]
+
+    for line in lines:
+        tokens = re.split(r"\s+", re.sub(r"[:=;]", " ", line).strip())
+        tokens = [t for t in tokens if t]
+        if len(tokens) % 2:
+            errors.append(line.strip())
+            continue
+        for club_str, amount_str in zip(tokens[::2], tokens[1::2]):
+            club_str = clean_id(club_str)
+            amount_str = amount_str.replace(",", "").strip()
+            if club_str.isdigit() and amount_str.isdigit() and int(amount_str) > 0:
+                pairs.append((int(club_str), int(amount_str)))
+            else:
+                errors.append(f"{club_str} {amount_str}")
+    return pairs, errors
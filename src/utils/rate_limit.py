@@ -0,0 +1,34 @@
+import time
+
+# Outbound Telegram queue priorities (lower value = sent first). Replies
+# use the default; alerts pass rate_limit_args=PRIORITY_ALERT to their
+# send_message calls.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_ALERT = 10
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # set by the owner, e.g. on a Telegram RetryAfter
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 = available now)."""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional, TypedDict, Union
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple, TypedDict, Union
 
 # Define Role type
 Role = str  # could be Literal["Union Head", "Region Head", "Club Owner"]
@@ -9,7 +10,7 @@ class UserRole(TypedDict, total=False):
     clubs: List[int]  # optional: Club IDs this user can manage/view
 
 
-# Users & their roles
+# Users & their roles (defaults; replaced by the DB role store when it has rows)
 user_roles: List[UserRole] = [
     {"userId": 7978542634, "role": "Union Head"},
     {"userId": 846248501, "role": "Union Head"},
@@ -28,6 +29,7 @@ permissions: Dict[Role, List[str]] = {
         "send-credit",
         "claim-credit",
         "view-club-limit",
+        "manage-roles",
     ],
     "Region Head": ["set-region-limit", "set-club-limit", "view-club-limit"],
     "Club Owner": ["view-club-limit"],  # 👈 only this
@@ -41,26 +43,144 @@ COMMAND_TO_CAP: Dict[str, str] = {
     "addsl": "set-club-limit",
     "subsl": "set-club-limit",
     "setsl": "set-club-limit",
+    "bulklimit": "set-club-limit",
     "cl": "view-club-limit",   # 👈 map /cl to "view-club-limit"
     "scr": "send-credit",
+    "scrbatch": "send-credit",
     "ccr": "claim-credit",
+    "reloadroles": "manage-roles",
 }
 
 
+# Roles whose scope is every club
+ALL_CLUBS_ROLES = {"Union Head"}
+
+# Widest first; picks a user's primary role. Roles not listed (e.g. added
+# in the DB role store) rank after these, by name.
+ROLE_PRECEDENCE: Tuple[Role, ...] = ("Union Head", "Region Head", "Club Owner")
+
+
+@dataclass(frozen=True)
+class UserAccess:
+    """
+    Everything one user may do, merged across all of their role entries.
+
+    `scopes` maps capability -> clubs it applies to (None = every club), so
+    a Club Owner entry does not widen what a Region Head entry may change.
+    `role_clubs` keeps the clubs listed per role (e.g. the Region Head region).
+    """
+    user_id: int
+    roles: FrozenSet[Role]
+    capabilities: FrozenSet[str]
+    clubs: FrozenSet[int]
+    scopes: Dict[str, Optional[FrozenSet[int]]]
+    role_clubs: Dict[Role, FrozenSet[int]]
+
+    @property
+    def all_clubs(self) -> bool:
+        return bool(self.roles & ALL_CLUBS_ROLES)
+
+    def can(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+    def can_access(self, capability: str, club_id: int) -> bool:
+        if capability not in self.scopes:
+            return False
+        scope = self.scopes[capability]
+        return scope is None or club_id in scope
+
+
+def build_role_index(
+    roles: List[UserRole],
+    perms: Dict[Role, List[str]],
+) -> Dict[int, UserAccess]:
+    """Compile role entries into user_id -> UserAccess."""
+    grouped: Dict[int, List[UserRole]] = {}
+    for entry in roles:
+        grouped.setdefault(int(entry["userId"]), []).append(entry)
+
+    index: Dict[int, UserAccess] = {}
+    for user_id, entries in grouped.items():
+        scopes: Dict[str, Optional[set]] = {}
+        clubs: set = set()
+        role_clubs: Dict[Role, set] = {}
+        for entry in entries:
+            role = entry["role"]
+            try:
+                entry_clubs = {int(c) for c in (entry.get("clubs") or [])}
+            except (TypeError, ValueError):
+                entry_clubs = set()
+            clubs |= entry_clubs
+            role_clubs.setdefault(role, set()).update(entry_clubs)
+            for cap in perms.get(role, []):
+                if role in ALL_CLUBS_ROLES or scopes.get(cap, set()) is None:
+                    scopes[cap] = None
+                else:
+                    scopes.setdefault(cap, set()).update(entry_clubs)
+
+        index[user_id] = UserAccess(
+            user_id=user_id,
+            roles=frozenset(e["role"] for e in entries),
+            capabilities=frozenset(scopes),
+            clubs=frozenset(clubs),
+            scopes={cap: (None if sc is None else frozenset(sc)) for cap, sc in scopes.items()},
+            role_clubs={role: frozenset(c) for role, c in role_clubs.items()},
+        )
+    return index
+
+
+_role_index: Dict[int, UserAccess] = {}
+
+
+def rebuild_role_index() -> None:
+    """Recompile the index; call after changing user_roles/permissions."""
+    global _role_index
+    _role_index = build_role_index(user_roles, permissions)
+
+
+def set_roles(new_user_roles: List[UserRole], new_permissions: Optional[Dict[Role, List[str]]] = None) -> None:
+    """Replace the role data and rebuild the index in one step."""
+    global user_roles, permissions
+    user_roles = list(new_user_roles)
+    if new_permissions is not None:
+        permissions = dict(new_permissions)
+    rebuild_role_index()
+
+
+def get_user_access(user_id: int) -> Optional[UserAccess]:
+    return _role_index.get(int(user_id))
+
+
+def get_users_with_role(role: Role) -> List[int]:
+    return [a.user_id for a in _role_index.values() if role in a.roles]
+
+
 def has_permission(user_id: int, command: str) -> bool:
     """
     Check if user has permission to run a given command.
     """
-    user = next((u for u in user_roles if u["userId"] == user_id), None)
-    if not user:
+    access = _role_index.get(int(user_id))
+    if not access:
         return False
 
     cap = COMMAND_TO_CAP.get(command, command)
-    return cap in permissions[user["role"]]
+    return access.can(cap)
 
 
 def get_user_role(user_id: int) -> Optional[UserRole]:
     """
-    Get the user role definition.
+    Get the user role definition, merged across all entries for the user.
+    "role" is the widest role held, by ROLE_PRECEDENCE.
     """
-    return next((u for u in user_roles if u["userId"] == user_id), None)
+    access = _role_index.get(int(user_id))
+    if not access:
+        return None
+    rank = {role: i for i, role in enumerate(ROLE_PRECEDENCE)}
+    primary = min(access.roles, key=lambda r: (rank.get(r, len(rank)), r))
+    merged: UserRole = {"userId": access.user_id, "role": primary}
+    if access.clubs:
+        merged["clubs"] = sorted(access.clubs)
+    return merged
+
+
+rebuild_role_index()
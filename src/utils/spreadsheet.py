@@ -0,0 +1,46 @@
+import csv
+from typing import Any, Iterator, List
+
+try:
+    # Optional: only needed for .xlsx uploads
+    from openpyxl import load_workbook
+    XLSX_AVAILABLE = True
+except ImportError:
+    load_workbook = None
+    XLSX_AVAILABLE = False
+
+
+def _cell(value: Any) -> str:
+    """Spreadsheet cell -> trimmed string (1000.0 -> "1000")."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def iter_sheet_rows(path: str) -> Iterator[List[str]]:
+    """
+    Yield the rows of a .csv or .xlsx file one at a time as lists of
+    strings, without loading the whole file. XLSX uses the first sheet in
+    openpyxl read-only mode.
+    """
+    if path.lower().endswith(".xlsx"):
+        if not XLSX_AVAILABLE:
+            raise RuntimeError("XLSX support is not installed (pip install openpyxl)")
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in wb.worksheets[0].iter_rows(values_only=True):
+                yield [_cell(v) for v in row]
+        finally:
+            wb.close()
+        return
+
+    # utf-8-sig drops the BOM Excel adds to CSV exports
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        # Delimiter from the header line (Excel uses ";" in some locales)
+        header = f.readline()
+        f.seek(0)
+        delimiter = max((",", ";", "\t"), key=header.count)
+        for row in csv.reader(f, delimiter=delimiter):
+            yield [_cell(v) for v in row]